@@ -1,5 +1,6 @@
 # config.py
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -27,9 +28,33 @@ RAW_DIR = f"{DATA_DIR}/raw"
 PROCESSED_DIR = f"{DATA_DIR}/processed"
 CHAMP_INDEX_PATH = f"{PROCESSED_DIR}/champ_index.json"
 BASE_CSV = f"{PROCESSED_DIR}/base_matches.csv"
+MATCH_STORE_DIR = f"{PROCESSED_DIR}/matches"  # parquet, partitioned patch=<p>/region=<r>
 WORLDS_CSV = "examples/worlds_matches.csv"  # user-provided CSV of Worlds matches
 MODEL_DIR = "models"
+PATCH_MODEL_DIR = f"{MODEL_DIR}/patches"  # one sub-directory per patch, see src/train_patches.py
+PATCH_MODEL_CACHE_SIZE = 8  # per-patch models kept loaded at once by inference
+
+# Draft-state probability cache (shared by GUI sessions in one process)
+DRAFT_CACHE_SIZE = 50000
+DRAFT_CACHE_TTL = 6 * 3600  # seconds; None keeps entries until evicted by LRU
+DRAFT_CACHE_PATH = f"{MODEL_DIR}/draft_cache.joblib"  # set to None to disable persistence
+SPECULATIVE_CPU_FRACTION = 0.5  # share of cores the GUI may use to precompute likely next drafts
 os.makedirs(RAW_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Model hyperparameters (defaults; src/tune.py writes tuned values to TUNED_PARAMS_PATH,
+# which override these on import)
+RF_BASE_PARAMS = {"n_estimators": 300, "max_depth": 12}
+RF_WORLD_PARAMS = {"n_estimators": 200, "max_depth": 10}
+EMBED_PARAMS = {"emb_dim": 64, "lr": 1e-3, "batch_size": 256, "epochs": 12}
+# Out-of-core trainer (src/train_ooc.py): rows per streamed chunk bound the memory used
+OOC_PARAMS = {"chunk_size": 50000, "epochs": 3, "alpha": 1e-4, "fm_dim": 16, "fm_lr": 0.05, "fm_reg": 1e-5,
+              "holdout_every": 10}
+TUNED_PARAMS_PATH = f"{MODEL_DIR}/tuned_params.json"
+if os.path.exists(TUNED_PARAMS_PATH):
+    with open(TUNED_PARAMS_PATH, "r", encoding="utf8") as f:
+        _tuned = json.load(f)
+    RF_BASE_PARAMS.update(_tuned.get("rf_base", {}))
+    RF_WORLD_PARAMS.update(_tuned.get("rf_world", {}))
+    EMBED_PARAMS.update(_tuned.get("embed", {}))
@@ -0,0 +1,167 @@
+# scripts/benchmark_ooc.py
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from config import BASE_CSV, MODEL_DIR, OOC_PARAMS
+from src.match_store import SCHEMA, BLUE_COLS, RED_COLS, partition_dir
+from src.utils import CHAMP_TO_IDX
+
+# Each (size, model) run happens in a fresh subprocess and reports its max RSS, which (unlike
+# tracemalloc) includes sklearn's C-level tree arrays. Every size is first written to a temporary
+# match store: the RF run loads it into memory, the out-of-core runs stream it with iter_store_chunks.
+
+
+def synthetic_chunks(n, num_champs, chunk_size, seed=0):
+    """Random drafts labelled by a hidden model with champion strengths, synergies and counters."""
+    rng = np.random.default_rng(seed)
+    strength = rng.normal(0, 0.3, num_champs)
+    emb = rng.normal(0, 0.3, (num_champs, 4))
+    syn = lambda t: np.einsum("nik,njk->n", emb[t], emb[t]) - (emb[t] ** 2).sum(axis=(1, 2))
+    for s in range(0, n, chunk_size):
+        m = min(chunk_size, n - s)
+        idx = np.argsort(rng.random((m, num_champs)), axis=1)[:, :10]
+        blue, red = idx[:, :5], idx[:, 5:]
+        counter = np.einsum("nik,njk->n", emb[blue][..., :2], emb[red][..., 2:])
+        logit = strength[blue].sum(1) - strength[red].sum(1) + 0.5 * (syn(blue) - syn(red)) + counter + 0.1
+        y = (rng.random(m) < 1 / (1 + np.exp(-logit))).astype(np.int64)
+        yield np.arange(s, s + m), blue, red, y
+
+
+def source_chunks(source, n, num_champs, chunk_size, csv_path=BASE_CSV):
+    """The first n rows of the source as (ids, blue_idx, red_idx, y) chunks."""
+    from src.train_ooc import iter_csv_chunks, iter_store_chunks
+    if source == "synthetic":
+        chunks = synthetic_chunks(n, num_champs, chunk_size)
+    elif source == "store":
+        chunks = iter_store_chunks(chunk_size=chunk_size)
+    else:
+        chunks = iter_csv_chunks(csv_path, chunk_size=chunk_size)
+    got = 0
+    for ids, b, r, y in chunks:
+        take = min(len(y), n - got)
+        yield ids[:take], b[:take], r[:take], y[:take]
+        got += take
+        if got >= n:
+            return
+
+
+def write_bench_store(chunks, root):
+    """Write chunks as part files of one partition, the same layout the match store uses."""
+    out_dir = partition_dir("bench", "bench", root)
+    os.makedirs(out_dir, exist_ok=True)
+    n = 0
+    for i, (ids, b, r, y) in enumerate(chunks):
+        df = pd.DataFrame({"match_id": np.asarray(ids).astype(str), "winner": y.astype(np.int8)})
+        for j, c in enumerate(BLUE_COLS):
+            df[c] = b[:, j].astype(np.int16)
+        for j, c in enumerate(RED_COLS):
+            df[c] = r[:, j].astype(np.int16)
+        pq.write_table(pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False),
+                       os.path.join(out_dir, f"part-{i:05d}.parquet"))
+        n += len(y)
+    return n
+
+
+# -------------------------
+# One measured run (subprocess)
+# -------------------------
+def max_rss_mib():
+    """Peak resident set size of this process in MiB."""
+    # VmHWM starts fresh at exec; ru_maxrss would also carry the parent's peak across the fork
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def run_one(kind, root, num_champs, epochs, chunk_size):
+    from src.train_ooc import evaluate_ooc, fit_ooc, is_holdout, iter_store_chunks, make_model
+    holdout_every = OOC_PARAMS["holdout_every"]
+    base_rss = max_rss_mib()
+    t0 = time.time()
+    if kind == "rf":
+        from src.match_store import load_matches
+        from src.train_base import fit_rf
+        from src.utils import index_matrix_to_signed
+        # the in-memory path: whole store -> dense matrix -> forest
+        df = load_matches(columns=["match_id", "winner"] + BLUE_COLS + RED_COLS, root=root)
+        hold = is_holdout(df["match_id"].to_numpy(), holdout_every)
+        X = index_matrix_to_signed(df[BLUE_COLS].to_numpy(np.int64), df[RED_COLS].to_numpy(np.int64), num_champs)
+        y = df["winner"].to_numpy(np.int64)
+        del df
+        model = fit_rf(X[~hold], y[~hold])
+        secs = time.time() - t0
+        acc = float(model.score(X[hold], y[hold]))
+    else:
+        chunks = lambda rng=None: iter_store_chunks(chunk_size=chunk_size, root=root, rng=rng)
+        model = fit_ooc(make_model(kind, num_champs), chunks, epochs, holdout_every, verbose=False)
+        secs = time.time() - t0
+        acc = evaluate_ooc(model, chunks(), holdout_every)["accuracy"]
+    return {"accuracy": round(acc, 4), "train_seconds": round(secs, 2),
+            "peak_rss_mib": round(max_rss_mib(), 1), "base_rss_mib": round(base_rss, 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Accuracy / wall time / peak RSS: in-memory RF vs out-of-core models.")
+    ap.add_argument("--source", choices=["synthetic", "store", "csv"], default="synthetic")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20000, 50000, 100000])
+    ap.add_argument("--models", nargs="+", default=["rf", "sgd", "fm"])
+    ap.add_argument("--epochs", type=int, default=OOC_PARAMS["epochs"])
+    ap.add_argument("--chunk-size", type=int, default=OOC_PARAMS["chunk_size"])
+    ap.add_argument("--num-champs", type=int, default=None, help="Champion count for --source synthetic")
+    ap.add_argument("--out", default=os.path.join(MODEL_DIR, "benchmark_ooc.csv"))
+    ap.add_argument("--worker", default=None, help=argparse.SUPPRESS)  # internal: one measured run
+    ap.add_argument("--root", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    num_champs = args.num_champs or len(CHAMP_TO_IDX) or 170
+    if args.worker:
+        print(json.dumps(run_one(args.worker, args.root, num_champs, args.epochs, args.chunk_size)))
+        return
+
+    results = []
+    for n in args.sizes:
+        root = tempfile.mkdtemp(prefix="lol_bench_")
+        try:
+            rows = write_bench_store(source_chunks(args.source, n, num_champs, args.chunk_size), root)
+            print(f"\n== {rows} rows (10% holdout by match id) ==")
+            for kind in args.models:
+                cmd = [sys.executable, os.path.abspath(__file__), "--worker", kind, "--root", root,
+                       "--num-champs", str(num_champs), "--epochs", str(args.epochs),
+                       "--chunk-size", str(args.chunk_size)]
+                proc = subprocess.run(cmd, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    print(f"{kind:>4}: failed\n{proc.stderr}")
+                    continue
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                print(f"{kind:>4}: accuracy {r['accuracy']:.4f}  train {r['train_seconds']:7.1f}s  "
+                      f"peak RSS {r['peak_rss_mib']:8.1f} MiB (after imports {r['base_rss_mib']:.1f})")
+                results.append({"rows": rows, "model": kind, **r})
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    pd.DataFrame(results).to_csv(args.out, index=False)
+    print("\nSaved results to", args.out)
+
+
+if __name__ == "__main__":
+    main()
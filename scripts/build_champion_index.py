@@ -1,5 +1,5 @@
 # scripts/build_champion_index.py
-import json, pandas as pd
+import json, os, pandas as pd
 from config import BASE_CSV, WORLDS_CSV, CHAMP_INDEX_PATH
 from ast import literal_eval
 
@@ -15,8 +15,14 @@ def gather_champs():
                 champs = literal_eval(s)
                 for c in champs:
                     champions.add(c)
-    champ_list = sorted(list(champions))
-    idx = {c:i for i,c in enumerate(champ_list)}
+    # keep ids already assigned (the partitioned match store holds integer champion ids),
+    # append newly seen champions in sorted order
+    idx = {}
+    if os.path.exists(CHAMP_INDEX_PATH):
+        with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
+            idx = json.load(f)
+    for c in sorted(champions - set(idx)):
+        idx[c] = len(idx)
     with open(CHAMP_INDEX_PATH, "w", encoding="utf8") as f:
         json.dump(idx, f, ensure_ascii=False, indent=2)
     print("Saved champ index", CHAMP_INDEX_PATH, "count=", len(idx))
@@ -57,6 +57,8 @@ def main():
     ap.add_argument("--patch-prefix", default=None, help='Keep rows where patch starts with this (e.g. "25.20").')
     ap.add_argument("--league-like", default=None, help='Substring filter on league/tournament name (e.g. "World").')
     ap.add_argument("--require-5", action="store_true", help="Drop games that don't have exactly 5 champs per side.")
+    ap.add_argument("--store-region", default=None,
+                    help='Also append the games to the partitioned match store under this region (e.g. "worlds").')
     args = ap.parse_args()
 
     os.makedirs(os.path.dirname(args.outfile), exist_ok=True)
@@ -130,6 +132,10 @@ def main():
     out = pd.DataFrame(rows).drop_duplicates(subset=["match_id"])
     out.to_csv(args.outfile, index=False)
     print(f"Wrote {len(out)} games to {args.outfile}")
+    if args.store_region and not out.empty:
+        from src.match_store import append_matches
+        n = append_matches(out, args.store_region)
+        print(f"Appended {n} new games to the match store (region={args.store_region})")
 
 if __name__ == "__main__":
     main()
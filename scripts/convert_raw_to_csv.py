@@ -1,9 +1,10 @@
 # scripts/convert_raw_to_csv.py
-import json, os, glob, csv
+import argparse, json, os, glob, csv
 from config import RAW_DIR, PROCESSED_DIR, BASE_CSV, TARGET_PATCH
 from tqdm import tqdm
 
-def extract_champs_from_match(m):
+def extract_champs_from_match(m, patch=TARGET_PATCH):
+    """Ranked solo (queue 420) match -> row dict; patch=None keeps every patch."""
     info = m.get("info", {})
     # check queueId
     if info.get("queueId") != 420:
@@ -11,7 +12,7 @@ def extract_champs_from_match(m):
     # patch in gameVersion e.g. "25.20.123"
     gv = info.get("gameVersion", "")
     version_short = ".".join(gv.split(".")[:2])
-    if version_short != TARGET_PATCH:
+    if patch is not None and version_short != patch:
         return None
     participants = info.get("participants", [])
     blue = []
@@ -38,15 +39,25 @@ def extract_champs_from_match(m):
         "winner": winner
     }
 
+def region_from_filename(path):
+    # ingest_matches saves raw files as <region>_<matchId>.json
+    return os.path.basename(path).split("_", 1)[0]
+
 def main():
+    ap = argparse.ArgumentParser(description="Convert raw match JSONs to the base CSV or the partitioned match store.")
+    ap.add_argument("--store", action="store_true",
+                    help="Append all patches to the partitioned match store instead of writing BASE_CSV")
+    args = ap.parse_args()
+
     files = glob.glob(os.path.join(RAW_DIR, "*.json"))
     outrows = []
     for f in tqdm(files):
         try:
             with open(f, "r", encoding="utf8") as fh:
                 m = json.load(fh)
-            row = extract_champs_from_match(m)
+            row = extract_champs_from_match(m, patch=None if args.store else TARGET_PATCH)
             if row:
+                row["region"] = region_from_filename(f)
                 outrows.append(row)
         except Exception as ex:
             print("parse error", f, ex)
@@ -59,9 +70,17 @@ def main():
             continue
         seen.add(mid)
         dedup.append(r)
+    if args.store:
+        from src.match_store import append_matches
+        written = 0
+        for region in sorted({r["region"] for r in dedup}):
+            written += append_matches([r for r in dedup if r["region"] == region], region)
+        print("Appended", written, "new rows to the match store")
+        return
     # write CSV
     with open(BASE_CSV, "w", newline="", encoding="utf8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=["match_id","patch","blue_champs","red_champs","winner"])
+        writer = csv.DictWriter(csvfile, fieldnames=["match_id","patch","blue_champs","red_champs","winner"],
+                                extrasaction="ignore")
         writer.writeheader()
         for r in dedup:
             writer.writerow(r)
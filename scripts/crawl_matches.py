@@ -0,0 +1,197 @@
+# scripts/crawl_matches.py
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.ingest_matches import REGIONS, save_raw_match
+from scripts.convert_raw_to_csv import extract_champs_from_match
+from src.crawl_state import CrawlState, TIER_RANK
+
+LEAGUE_PATHS = {
+    "CHALLENGER": "/lol/league/v4/challengerleagues/by-queue/RANKED_SOLO_5x5",
+    "GRANDMASTER": "/lol/league/v4/grandmasterleagues/by-queue/RANKED_SOLO_5x5",
+    "MASTER": "/lol/league/v4/masterleagues/by-queue/RANKED_SOLO_5x5",
+}
+
+
+class RiotHttpClient:
+    """
+    Minimal Riot REST client. base_url is formatted with {host} (platform or routing value),
+    so a local stub works too: --base-url "http://127.0.0.1:8765/{host}".
+    """
+
+    def __init__(self, api_key, base_url="https://{host}.api.riotgames.com", retries=3, min_interval=1.2):
+        self.session = requests.Session()
+        self.session.headers["X-Riot-Token"] = api_key or ""
+        self.base_url = base_url
+        self.retries = retries
+        self.min_interval = min_interval  # seconds between requests, to be nice to rate limits
+        self._last = 0.0
+
+    def _get(self, host, path, params=None):
+        for _ in range(self.retries):
+            wait = self.min_interval - (time.time() - self._last)
+            if wait > 0:
+                time.sleep(wait)
+            self._last = time.time()
+            try:
+                r = self.session.get(self.base_url.format(host=host.lower()) + path, params=params, timeout=30)
+            except requests.RequestException as ex:
+                print("Error:", ex)
+                return None
+            if r.status_code == 200:
+                return r.json()
+            print(f"API error {r.status_code}: {path}")
+            if r.status_code == 429:
+                time.sleep(float(r.headers.get("Retry-After", 120)))
+            elif r.status_code in {500, 502, 503, 504}:
+                time.sleep(10)
+            else:
+                return None
+        return None
+
+    def league_entries(self, platform, tier):
+        data = self._get(platform, LEAGUE_PATHS[tier])
+        return (data or {}).get("entries", [])
+
+    def match_ids(self, routing, puuid, count=20):
+        return self._get(routing, f"/lol/match/v5/matches/by-puuid/{puuid}/ids", {"queue": 420, "count": count}) or []
+
+    def match(self, routing, match_id):
+        return self._get(routing, f"/lol/match/v5/matches/{match_id}")
+
+
+class Crawler:
+    """Snowball crawl: expand participants of fetched matches, highest tier / most recent first."""
+
+    def __init__(self, client, state, regions, per_player=20, archive=True, store=False,
+                 checkpoint_every=100, tiers=("CHALLENGER", "GRANDMASTER", "MASTER")):
+        self.client = client
+        self.state = state
+        self.regions = {r["name"]: r for r in regions}
+        self.per_player = per_player
+        self.archive = archive
+        self.store = store
+        self.checkpoint_every = checkpoint_every
+        self.tiers = tiers
+        self._rows = {}  # region -> pending store rows
+        self.fetched = int(state.get_meta("matches_fetched", 0))
+        self.max_matches = None
+
+    def seed(self):
+        """Queue the Master+ ladder of every region (once per crawl state)."""
+        if self.state.get_meta("seeded") == "1":
+            return
+        now = time.time()
+        for name, r in self.regions.items():
+            for tier in self.tiers:
+                entries = self.client.league_entries(r["platform"], tier)
+                puuids = [e["puuid"] for e in entries if isinstance(e, dict) and e.get("puuid")]
+                self.state.set_tiers([(p, TIER_RANK[tier]) for p in puuids])
+                for p in puuids:
+                    self.state.push(p, name, TIER_RANK[tier], now)
+                print(f"[{name}] seeded {len(puuids)} {tier} PUUIDs")
+        self.state.set_meta("seeded", 1)
+        self.state.checkpoint()
+
+    def expand(self, puuid, region):
+        routing = self.regions[region]["routing"]
+        for mid in self.client.match_ids(routing, puuid, count=self.per_player):
+            if self.max_matches is not None and self.fetched >= self.max_matches:
+                break
+            if self.state.seen("match", mid):
+                continue
+            m = self.client.match(routing, mid)
+            if not m:
+                continue  # left unseen so a later pass can retry it
+            self.state.mark_seen("match", mid)
+            self.fetched += 1
+            if self.archive:
+                save_raw_match(m, mid, region)
+            if self.store:
+                row = extract_champs_from_match(m, patch=None)
+                if row and row["winner"]:
+                    self._rows.setdefault(region, []).append(row)
+            info = m.get("info", {})
+            recency = (info.get("gameEndTimestamp") or info.get("gameCreation") or 0) / 1000.0
+            for p in info.get("participants", []):
+                other = p.get("puuid")
+                if other and other != puuid:
+                    self.state.push(other, region, self.state.tier_of(other), recency)
+            if self.fetched % self.checkpoint_every == 0:
+                self.checkpoint()
+
+    def checkpoint(self):
+        if self._rows:
+            from src.match_store import append_matches
+            for region, rows in self._rows.items():
+                append_matches(rows, region)
+            self._rows = {}
+        self.state.set_meta("matches_fetched", self.fetched)
+        self.state.checkpoint()
+        print(f"checkpoint: {self.fetched} matches, {self.state.count_seen('puuid')} players expanded, "
+              f"frontier {self.state.frontier_size()}")
+
+    def run(self, max_matches):
+        self.max_matches = max_matches
+        self.seed()
+        try:
+            while self.fetched < max_matches:
+                batch = self.state.pop(50, regions=list(self.regions))
+                if not batch:
+                    print("Frontier exhausted")
+                    break
+                for i, (puuid, region, _, _) in enumerate(batch):
+                    if self.fetched >= max_matches:
+                        # hand the unexpanded rest back to the frontier for the next run
+                        for p, r, tier, recency in batch[i:]:
+                            self.state.push(p, r, tier, recency)
+                        break
+                    if self.state.mark_seen("puuid", puuid):
+                        self.expand(puuid, region)
+        finally:
+            self.checkpoint()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Snowball match crawler with a resumable priority frontier.")
+    ap.add_argument("--state", default=os.path.join("data", "crawl", "state.sqlite"),
+                    help="Crawl state file; re-run with the same path to resume")
+    ap.add_argument("--regions", nargs="*", default=[r["name"] for r in REGIONS])
+    ap.add_argument("--max-matches", type=int, default=100000, help="Stop after this many matches in total")
+    ap.add_argument("--per-player", type=int, default=20, help="Match ids requested per expanded player")
+    ap.add_argument("--checkpoint-every", type=int, default=100)
+    ap.add_argument("--bloom-capacity", type=int, default=50_000_000)
+    ap.add_argument("--store", action="store_true", help="Also append matches to the partitioned match store")
+    ap.add_argument("--no-archive", action="store_true", help="Don't write raw JSON to data/raw")
+    ap.add_argument("--base-url", default="https://{host}.api.riotgames.com",
+                    help='API base URL; use e.g. "http://127.0.0.1:8765/{host}" with scripts/riot_stub_server.py')
+    ap.add_argument("--min-interval", type=float, default=1.2, help="Seconds between API requests")
+    args = ap.parse_args()
+
+    api_key = os.getenv("RIOT_API_KEY")
+    if not api_key and "api.riotgames.com" in args.base_url:
+        print("No RIOT_API_KEY found. Put it in .env")
+        return
+
+    state = CrawlState(args.state, bloom_capacity=args.bloom_capacity)
+    client = RiotHttpClient(api_key, base_url=args.base_url, min_interval=args.min_interval)
+    regions = [r for r in REGIONS if r["name"] in args.regions]
+    crawler = Crawler(client, state, regions, per_player=args.per_player, archive=not args.no_archive,
+                      store=args.store, checkpoint_every=args.checkpoint_every)
+    try:
+        crawler.run(args.max_matches)
+    except KeyboardInterrupt:
+        print("Interrupted; state checkpointed, re-run to resume")
+    finally:
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -126,6 +126,8 @@ def main():
                     help="Path to write CSV")
     ap.add_argument("--where-extra", default=None,
                     help="Extra WHERE clause, e.g. \"MatchScheduleGame.DateTime_UTC >= '2025-10-01'\"")
+    ap.add_argument("--store-region", default=None,
+                    help='Also append the games to the partitioned match store under this region (e.g. "worlds")')
     args = ap.parse_args()
 
     out_rows = []
@@ -152,6 +154,10 @@ def main():
         w.writerows(dedup)
 
     print(f"Wrote {len(dedup)} games to {args.outfile}")
+    if args.store_region and dedup:
+        from src.match_store import append_matches
+        n = append_matches(dedup, args.store_region)
+        print(f"Appended {n} new games to the match store (region={args.store_region})")
 
 if __name__ == "__main__":
     main()
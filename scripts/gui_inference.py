@@ -10,7 +10,14 @@ import sys, os
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from src.inference import predict_rf
+import atexit
+import uuid
+from src.inference import predict_rf_proba, predict_rf_proba_batch, load_rf_model
+from src.draft_cache import DraftStateCache, model_version
+from src.suggest import suggest_next, SpeculativePrecomputer
+from src.rollout import rollout_win_prob, get_priors
+from src.explain import explainer_for
+from config import DRAFT_CACHE_SIZE, DRAFT_CACHE_TTL, DRAFT_CACHE_PATH, SPECULATIVE_CPU_FRACTION
 
 ROOT = Path(__file__).resolve().parents[1]
 CHAMP_INDEX = ROOT / "data" / "processed" / "champ_index.json"
@@ -32,8 +39,17 @@ def pick_model_path():
         return str(MODEL_BASE)
     return None
 
+@st.cache_resource
+def get_draft_cache():
+    # one cache per server process, shared by every browser session
+    persist = str(ROOT / DRAFT_CACHE_PATH) if DRAFT_CACHE_PATH else None
+    cache = DraftStateCache(max_size=DRAFT_CACHE_SIZE, ttl=DRAFT_CACHE_TTL, persist_path=persist)
+    atexit.register(cache.save)
+    return cache
+
 ALL_CHAMPS = load_champion_list()
 MODEL_PATH = pick_model_path()
+DRAFT_CACHE = get_draft_cache()
 
 st.set_page_config(page_title="LoL Draft Predictor", page_icon="🧠", layout="centered")
 st.title("🧠 LoL Draft Predictor (with autocomplete)")
@@ -42,6 +58,32 @@ if MODEL_PATH is None:
     st.error("No model found. Train a model first (rf_base.joblib or rf_ensemble_world.joblib).")
     st.stop()
 
+MODEL_VERSION = model_version(MODEL_PATH)
+
+def predict_blue(blue_list, red_list):
+    """P(Blue wins) for a draft, served from the shared draft-state cache."""
+    return DRAFT_CACHE.get_or_compute(
+        blue_list, red_list, MODEL_VERSION,
+        lambda b, r: predict_rf_proba(b, r, model_path=MODEL_PATH),
+    )
+
+def score_many(states, record=True):
+    """P(Blue) for many drafts: cache hits are free, all misses go through one batched predict."""
+    return DRAFT_CACHE.get_or_compute_many(
+        states, MODEL_VERSION,
+        lambda blues, reds: predict_rf_proba_batch(blues, reds, model_path=MODEL_PATH),
+        record=record,
+    )
+
+@st.cache_resource
+def get_precomputer(model_path, version):
+    # one worker pool per process/model; sessions are tracked separately inside it
+    return SpeculativePrecomputer(score_many, version, cpu_fraction=SPECULATIVE_CPU_FRACTION)
+
+PRECOMPUTER = get_precomputer(MODEL_PATH, MODEL_VERSION)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
+
 st.caption(f"Using model: `{Path(MODEL_PATH).name}`")
 st.divider()
 
@@ -63,8 +105,25 @@ st.write(f"🧮 Current picks — Blue: {len(blue)}/5, Red: {len(red)}/5")
 # --- prediction block
 st.subheader("Prediction")
 try:
-    p_blue = predict_rf(blue, red, model_path=MODEL_PATH)
+    p_blue = predict_blue(blue, red)
     st.metric("P(Blue wins)", f"{p_blue*100:.1f}%")
+    if len(blue) < 5 or len(red) < 5:
+        # the model only saw full 5v5 drafts; average it over sampled completions instead
+        if st.checkbox("Estimate partial draft with rollouts", value=True):
+            est = rollout_win_prob(load_rf_model(MODEL_PATH), blue, red, get_priors(), n_samples=2048, time_budget=0.3)
+            st.metric(
+                "P(Blue wins), rollout estimate",
+                f"{est['blue_prob']*100:.1f}%",
+                help=f"95% CI {est['ci_low']*100:.1f}–{est['ci_high']*100:.1f}% over {est['n_samples']} completions",
+            )
+    if blue or red:
+        with st.expander("Why? Per-champion contributions"):
+            ex = explainer_for(load_rf_model(MODEL_PATH)).explain(blue, red)
+            st.caption(f"Random forest breakdown: baseline {ex['bias']*100:.1f}% + picks + other "
+                       f"= {ex['prob']*100:.1f}% (an ensemble's base forest is shown)")
+            for c, s_, v in ex["picks"]:
+                st.write(f"- **{c}** ({s_}): {'+' if v>=0 else ''}{v*100:.2f} pts for Blue")
+            st.write(f"- *champions not picked*: {'+' if ex['other']>=0 else ''}{ex['other']*100:.2f} pts for Blue")
 except Exception as e:
     st.info("Prediction will work best with valid champs; if the model needs full 5v5, finish picks first.")
     st.code(str(e))
@@ -76,29 +135,10 @@ st.subheader("Suggest next pick")
 side = st.radio("Who picks next?", ["blue", "red"], horizontal=True)
 top_n = st.slider("How many suggestions?", 5, 30, 10)
 
-def suggest_next(side: str, blue_list, red_list, candidates, topk=10):
-    base = predict_rf(blue_list, red_list, model_path=MODEL_PATH)
-    out = []
-    for c in candidates:
-        if side == "blue":
-            nb, nr = blue_list + [c], red_list
-        else:
-            nb, nr = blue_list, red_list + [c]
-        if len(nb) > 5 or len(nr) > 5:
-            continue
-        try:
-            p = predict_rf(nb, nr, model_path=MODEL_PATH)
-        except Exception:
-            continue
-        # delta for the *side to move*
-        delta = (p - base) if side == "blue" else ((1 - p) - (1 - base))
-        out.append((c, p, delta))
-    # sort by delta, tie-break by probability for the relevant side
-    out.sort(key=lambda x: (x[2], x[1] if side == "blue" else (1 - x[1])), reverse=True)
-    return base, out[:topk]
-
 if len(blue) <= 5 and len(red) <= 5:
-    base_p, picks = suggest_next(side, blue, red, remaining, top_n)
+    base_p, picks = suggest_next(side, blue, red, remaining, score_many, top_n)
+    # while the user decides, precompute the drafts they are most likely to reach next
+    PRECOMPUTER.schedule(st.session_state["session_id"], side, blue, red, picks, remaining)
     st.caption(f"Current P(Blue wins): {base_p:.4f}")
     if picks:
         st.write(f"Top {len(picks)} suggestions for **{side}**:")
@@ -110,5 +150,26 @@ if len(blue) <= 5 and len(red) <= 5:
     else:
         st.info("No valid suggestions (maybe you already have 5 champs on that side).")
 
+model = load_rf_model(MODEL_PATH)
+if hasattr(model, "timings"):
+    with st.expander("Ensemble members"):
+        for name, t in model.timings().items():
+            st.write(f"- **{name}** (weight {model.weights[name]:+.3f}): {t['calls']} calls, "
+                     f"{t['ms_per_call']:.2f} ms/call")
+
+DRAFT_CACHE.flush(min_dirty=500)
+stats = DRAFT_CACHE.stats()
+spec = PRECOMPUTER.stats()
+with st.expander("Draft cache stats"):
+    st.write(
+        f"Entries: {stats['size']}/{stats['max_size']} — hits: {stats['hits']}, "
+        f"misses: {stats['misses']}, evictions: {stats['evictions']}, "
+        f"hit rate: {stats['hit_rate']*100:.1f}%"
+    )
+    st.write(
+        f"Speculative work — pending: {spec['pending']}, completed: {spec['completed']}, "
+        f"cancelled: {spec['cancelled']}"
+    )
+
 st.divider()
 st.caption("Tip: start typing a champion name in the boxes above to autocomplete. Model prefers Worlds-tuned ensemble if present.")
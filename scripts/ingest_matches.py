@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 API_KEY = os.getenv("RIOT_API_KEY")
-watcher = LolWatcher(API_KEY)
+watcher = LolWatcher(API_KEY) if API_KEY else None  # main() reports a missing key
 
 # platform for league-v4; routing for match-v5
 REGIONS = [
@@ -54,13 +54,18 @@ def get_league_entries(platform: str):
 def get_match_ids_for_puuid(routing: str, puuid: str, count=20):
     return safe_fetch(watcher.match.matchlist_by_puuid, routing, puuid, count=count) or []
 
+def raw_match_path(match_id: str, region_tag: str):
+    return os.path.join(RAW_DIR, f"{region_tag}_{match_id}.json")
+
+def save_raw_match(m, match_id: str, region_tag: str):
+    with open(raw_match_path(match_id, region_tag), "w", encoding="utf-8") as f:
+        json.dump(m, f)
+
 def fetch_and_save_match(routing: str, match_id: str, region_tag: str):
     m = safe_fetch(watcher.match.by_id, routing, match_id)
     if not m:
         return False
-    out = os.path.join(RAW_DIR, f"{region_tag}_{match_id}.json")
-    with open(out, "w", encoding="utf-8") as f:
-        json.dump(m, f)
+    save_raw_match(m, match_id, region_tag)
     return True
 
 def main(max_per_summoner=5):
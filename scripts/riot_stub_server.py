@@ -0,0 +1,108 @@
+# scripts/riot_stub_server.py
+import argparse
+import hashlib
+import json
+import random
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Deterministic fake Riot API for exercising the crawler offline:
+#   python scripts/riot_stub_server.py --port 8765
+#   python scripts/crawl_matches.py --base-url "http://127.0.0.1:8765/{host}" --min-interval 0
+# URLs are /<host>/<normal Riot path>; every answer is derived from a hash of the request,
+# so repeated runs (and resumed crawls) see the same world.
+
+CHAMPS = [
+    "Aatrox", "Ahri", "Akali", "Alistar", "Aphelios", "Ashe", "Azir", "Bard", "Braum", "Caitlyn",
+    "Camille", "Corki", "Draven", "Ezreal", "Gnar", "Gragas", "Jax", "Jayce", "JarvanIV", "Jinx",
+    "Kaisa", "Kalista", "Karma", "LeeSin", "Leona", "Lulu", "Nautilus", "Orianna", "Rakan", "Rell",
+    "Renekton", "Rumble", "Ryze", "Sejuani", "Syndra", "Taliyah", "Varus", "Viego", "Xayah", "Xinzhao",
+]
+TIERS = {"challenger": 50, "grandmaster": 200, "master": 1000}
+
+
+def rng_for(*parts):
+    return random.Random(int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest(), 16))
+
+
+def puuid(host, n):
+    return f"{host}-player-{n}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    population = 20000
+    matches_per_player = 40
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+        parts = url.path.strip("/").split("/", 1)
+        if len(parts) != 2:
+            return self._send({"status": {"status_code": 404}}, 404)
+        host, path = parts[0], "/" + parts[1]
+
+        m = re.fullmatch(r"/lol/league/v4/(\w+)leagues/by-queue/RANKED_SOLO_5x5", path)
+        if m and m.group(1) in TIERS:
+            offset = sum(TIERS[t] for t in list(TIERS)[:list(TIERS).index(m.group(1))])
+            entries = [{"puuid": puuid(host, offset + i), "leaguePoints": 1000 - i} for i in range(TIERS[m.group(1)])]
+            return self._send({"tier": m.group(1).upper(), "entries": entries})
+
+        m = re.fullmatch(r"/lol/match/v5/matches/by-puuid/([^/]+)/ids", path)
+        if m:
+            count = int(q.get("count", ["20"])[0])
+            r = rng_for(m.group(1))
+            n_matches = self.population * self.matches_per_player // 10
+            ids = [f"{host.upper()}_{r.randrange(n_matches)}" for _ in range(min(count, self.matches_per_player))]
+            return self._send(ids)
+
+        m = re.fullmatch(r"/lol/match/v5/matches/([^/]+)", path)
+        if m:
+            mid = m.group(1)
+            r = rng_for(mid)
+            players = r.sample(range(self.population), 10)
+            champs = r.sample(CHAMPS, 10)
+            blue_win = r.random() < 0.5
+            end = 1_760_000_000_000 + r.randrange(30 * 24 * 3600 * 1000)
+            return self._send({
+                "metadata": {"matchId": mid, "participants": [puuid(host, p) for p in players]},
+                "info": {
+                    "queueId": 420,
+                    "gameVersion": f"15.{r.choice([19, 20])}.{r.randrange(500)}",
+                    "gameCreation": end - 1_800_000,
+                    "gameEndTimestamp": end,
+                    "participants": [
+                        {"puuid": puuid(host, p), "championName": c, "teamId": 100 if i < 5 else 200}
+                        for i, (p, c) in enumerate(zip(players, champs))
+                    ],
+                    "teams": [{"teamId": 100, "win": blue_win}, {"teamId": 200, "win": not blue_win}],
+                },
+            })
+
+        return self._send({"status": {"status_code": 404}}, 404)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local stub of the Riot league-v4 / match-v5 endpoints.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--population", type=int, default=20000, help="Number of distinct fake players per host")
+    args = ap.parse_args()
+    StubHandler.population = args.population
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"Riot stub listening on http://127.0.0.1:{args.port}/<host>/...")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
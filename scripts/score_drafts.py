@@ -0,0 +1,213 @@
+# scripts/score_drafts.py
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.explain import explainer_for
+from src.ensemble import model_width
+from src.inference import get_patch_registry, load_rf_model
+from src.utils import champs_to_index_matrix, index_matrix_to_signed, parse_champion_list
+
+# Standard tournament pick order: B1 R1 R2 B2 B3 R3 R4 B4 B5 R5. --trajectory assumes each side's
+# champion list is stored in pick order; match-v5 / Oracle's Elixir lists are in role order, in which
+# case the prefixes follow the stored order rather than the real pick sequence.
+PICK_ORDER = ["Blue", "Red", "Red", "Blue", "Blue", "Red", "Red", "Blue", "Blue", "Red"]
+
+_MODEL = None  # per-worker model, loaded once by _init_worker (None when routing by patch)
+_WARNED = set()  # patches this worker has already reported as unroutable
+
+
+def _init_worker(model_path, by_patch=False):
+    global _MODEL
+    _MODEL = None if by_patch else load_rf_model(model_path)
+
+
+def _model_groups(n, patches=None):
+    """
+    (row mask, model) pairs: all rows with the fixed model, or one group per patch routed through
+    the registry (loads lazily, keeps an LRU per worker). Rows whose patch is older than every
+    trained patch model get model None and are left unscored (NaN) rather than failing the run.
+    """
+    if _MODEL is not None:
+        return [(np.ones(n, dtype=bool), _MODEL)]
+    patches = np.asarray(patches).astype(str)
+    groups = []
+    for p in np.unique(patches):
+        rows = patches == p
+        if get_patch_registry().resolve(p, "rf") is None:
+            if p not in _WARNED:
+                _WARNED.add(p)
+                print(f"Warning: no patch model for patch {p} or any earlier patch; its rows are scored NaN")
+            groups.append((rows, None))
+        else:
+            groups.append((rows, load_rf_model(patch=p)))
+    return groups
+
+
+def _blue_proba(b_idx, r_idx, patches=None):
+    # vectors are built at each model's own width: the champion index may have grown since it was trained
+    out = np.full(len(b_idx), np.nan)
+    for rows, model in _model_groups(len(b_idx), patches):
+        if model is not None:
+            out[rows] = model.predict_proba(index_matrix_to_signed(b_idx[rows], r_idx[rows], model_width(model)))[:, 1]
+    return out
+
+
+def _explain(b_idx, r_idx, patches=None):
+    """Per-slot contributions (base forest), routed the same way as _blue_proba."""
+    n = len(b_idx)
+    cols = {"contrib_bias": np.full(n, np.nan)}
+    for side in ("blue", "red"):
+        for i in range(1, 6):
+            cols[f"contrib_{side}{i}"] = np.full(n, np.nan)
+    cols["contrib_other"] = np.full(n, np.nan)
+    for rows, model in _model_groups(n, patches):
+        if model is None:
+            continue
+        res = explainer_for(model).explain_indices(b_idx[rows], r_idx[rows])
+        cols["contrib_bias"][rows] = res["bias"]
+        for i in range(5):
+            cols[f"contrib_blue{i + 1}"][rows] = res["blue"][:, i]
+            cols[f"contrib_red{i + 1}"][rows] = res["red"][:, i]
+        cols["contrib_other"][rows] = res["other"]
+    return {k: np.round(v, 6) for k, v in cols.items()}
+
+
+def prefix_masks():
+    """For each pick step k (1..10), how many blue / red slots are filled."""
+    nb, nr = [], []
+    b = r = 0
+    for side in PICK_ORDER:
+        if side == "Blue":
+            b += 1
+        else:
+            r += 1
+        nb.append(b)
+        nr.append(r)
+    return np.array(nb), np.array(nr)
+
+
+def score_batch(df, trajectory=False, explain=False):
+    """Score one batch of drafts; returns a DataFrame of results in input order."""
+    blue_lists = [parse_champion_list(s) for s in df["blue_champs"]]
+    red_lists = [parse_champion_list(s) for s in df["red_champs"]]
+    # keep_slots: slot j stays the j-th listed champion, so prefixes line up with `picked` below
+    b_idx = champs_to_index_matrix(blue_lists, keep_slots=trajectory)
+    r_idx = champs_to_index_matrix(red_lists, keep_slots=trajectory)
+
+    if not trajectory:
+        out = pd.DataFrame({
+            "match_id": df["match_id"].values,
+            "patch": df["patch"].values,
+            "winner": df["winner"].values,
+            "blue_prob": np.round(_blue_proba(b_idx, r_idx, df["patch"].values), 6),
+        })
+        if explain:
+            for k, v in _explain(b_idx, r_idx, df["patch"].values).items():
+                out[k] = v
+        return out
+
+    # one row per (draft, pick step); slots beyond the prefix are blanked to -1
+    n = len(df)
+    nb, nr = prefix_masks()
+    steps = len(PICK_ORDER)
+    slot = np.arange(5)
+    b_rep = np.repeat(b_idx, steps, axis=0)
+    r_rep = np.repeat(r_idx, steps, axis=0)
+    nb_rep = np.tile(nb, n)[:, None]
+    nr_rep = np.tile(nr, n)[:, None]
+    b_rep[slot[None, :] >= nb_rep] = -1
+    r_rep[slot[None, :] >= nr_rep] = -1
+
+    # champion picked at each step (None if the draft has fewer picks recorded)
+    picked = []
+    for bl, rl in zip(blue_lists, red_lists):
+        for k, side in enumerate(PICK_ORDER):
+            src, i = (bl, nb[k] - 1) if side == "Blue" else (rl, nr[k] - 1)
+            picked.append(src[i] if i < len(src) else None)
+
+    return pd.DataFrame({
+        "match_id": np.repeat(df["match_id"].values, steps),
+        "patch": np.repeat(df["patch"].values, steps),
+        "winner": np.repeat(df["winner"].values, steps),
+        "step": np.tile(np.arange(1, steps + 1), n),
+        "side": np.tile(PICK_ORDER, n),
+        "champion": picked,
+        "blue_prob": np.round(_blue_proba(b_rep, r_rep, np.repeat(df["patch"].values, steps)), 6),
+    })
+
+
+def iter_batches(infile, chunksize, batch_size):
+    cols = ["match_id", "patch", "blue_champs", "red_champs", "winner"]
+    # patch as str: "15.20" must not become the float 15.2
+    for chunk in pd.read_csv(infile, chunksize=chunksize, usecols=lambda c: c in cols,
+                             dtype={"patch": str, "match_id": str}):
+        for c in cols:
+            if c not in chunk.columns:
+                chunk[c] = None
+        for start in range(0, len(chunk), batch_size):
+            yield chunk.iloc[start:start + batch_size]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream-score a CSV of drafts (worlds_matches.csv schema) with the RF model.")
+    ap.add_argument("--infile", required=True, help="Input CSV: match_id, patch, blue_champs, red_champs, winner")
+    ap.add_argument("--outfile", required=True, help="Output CSV (written incrementally)")
+    ap.add_argument("--model", default=None, help="Model path (default: models/rf_ensemble_world.joblib)")
+    ap.add_argument("--chunksize", type=int, default=100000, help="Rows read from the input per chunk")
+    ap.add_argument("--batch-size", type=int, default=10000, help="Rows scored per worker task")
+    ap.add_argument("--by-patch", action="store_true",
+                    help="Score each row with its patch model (models/patches/, nearest earlier patch as fallback; "
+                         "rows older than every patch model are scored NaN)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Process pool size")
+    ap.add_argument("--trajectory", action="store_true",
+                    help="Emit P(Blue) after every pick prefix (10 rows per draft) instead of one row per draft; "
+                         "prefixes follow the order of each stored champion list, which is only the real "
+                         "pick order if the input lists picks in order (match-v5 lists are in role order)")
+    ap.add_argument("--explain", action="store_true",
+                    help="Add per-pick contribution columns (contrib_blue1..red5, contrib_other, contrib_bias) "
+                         "from the RF (the base forest of an ensemble)")
+    args = ap.parse_args()
+    if args.explain and args.trajectory:
+        ap.error("--explain is only supported with one row per draft (no --trajectory)")
+
+    os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
+    if os.path.exists(args.outfile):
+        os.remove(args.outfile)
+
+    # bound the number of in-flight batches so memory stays flat regardless of input size
+    max_inflight = max(2, args.workers * 2)
+    pending = deque()
+    written = 0
+    header = True
+    t0 = time.time()
+
+    def drain_one():
+        nonlocal written, header
+        out = pending.popleft().result()
+        out.to_csv(args.outfile, mode="a", header=header, index=False)
+        header = False
+        written += len(out)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.model, args.by_patch)) as pool:
+        for batch in iter_batches(args.infile, args.chunksize, args.batch_size):
+            pending.append(pool.submit(score_batch, batch, args.trajectory, args.explain))
+            if len(pending) >= max_inflight:
+                drain_one()
+        while pending:
+            drain_one()
+
+    print(f"Wrote {written} rows to {args.outfile} in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# scripts/stream_pipeline.py
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from scripts.ingest_matches import (
+    API_KEY, REGIONS, watcher, safe_fetch, get_league_entries, get_match_ids_for_puuid,
+    raw_match_path, save_raw_match,
+)
+from scripts.convert_raw_to_csv import extract_champs_from_match
+from src.match_store import featurize_rows, append_featurized
+
+_DONE = object()  # queue sentinel
+
+
+def produce(region, raw_q, max_puuids, max_per_summoner, stop):
+    """Fetch match payloads for one region and push them straight onto the queue (no disk round-trip)."""
+    entries = get_league_entries(region["platform"])
+    puuids = list(dict.fromkeys(e["puuid"] for e in entries if isinstance(e, dict) and e.get("puuid")))
+    print(f"[{region['name']}] PUUIDs collected: {len(puuids)}")
+    for puuid in puuids[:max_puuids]:
+        if stop.is_set():
+            break
+        for mid in get_match_ids_for_puuid(region["routing"], puuid, count=max_per_summoner):
+            if os.path.exists(raw_match_path(mid, region["name"])):
+                continue  # archived by an earlier run
+            m = safe_fetch(watcher.match.by_id, region["routing"], mid)
+            if m:
+                raw_q.put((region["name"], mid, m, time.time()))
+        time.sleep(1.2)  # small delay to be nice to rate limits
+
+
+def featurize(raw_q, row_q, patch, n_producers):
+    """Archive each payload once, extract champions/winner and featurize immediately."""
+    remaining = n_producers
+    try:
+        while remaining:
+            item = raw_q.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            region, mid, m, fetched_at = item
+            # one bad payload (or a failed archive write) must not stop the pipeline
+            try:
+                save_raw_match(m, mid, region)
+                row = extract_champs_from_match(m, patch=patch)
+                if row and row["winner"]:
+                    row_q.put((region, featurize_rows(pd.DataFrame([row])), fetched_at))
+            except Exception as ex:
+                print(f"[{region}] skipping {mid}: {ex}")
+    finally:
+        # always release the writer, or it (and the main thread) wait forever
+        row_q.put(_DONE)
+
+
+def write(row_q, flush_rows, flush_seconds, stats):
+    """Micro-batch featurized rows into the partitioned store; tracks fetch-to-store latency."""
+    known_ids = {}
+    pending = {}  # region -> list of (frame, fetched_at)
+    last_flush = time.time()
+
+    def flush():
+        now = time.time()
+        for region, items in pending.items():
+            if not items:
+                continue
+            n = append_featurized(pd.concat([f for f, _ in items], ignore_index=True), region, known_ids=known_ids)
+            lat = [now - t for _, t in items]
+            stats["written"] += n
+            stats["max_latency"] = max(stats["max_latency"], max(lat))
+            stats["latency_sum"] += sum(lat)
+            stats["latency_n"] += len(lat)
+            print(f"[{region}] +{n} rows, freshness mean {sum(lat)/len(lat):.1f}s max {max(lat):.1f}s")
+        pending.clear()
+
+    while True:
+        try:
+            item = row_q.get(timeout=flush_seconds)
+        except queue.Empty:
+            item = None
+        if item is _DONE:
+            break
+        if item is not None:
+            region, frame, fetched_at = item
+            pending.setdefault(region, []).append((frame, fetched_at))
+        n_pending = sum(len(v) for v in pending.values())
+        if n_pending >= flush_rows or (n_pending and time.time() - last_flush >= flush_seconds):
+            flush()
+            last_flush = time.time()
+    flush()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fetch -> archive -> featurize -> match store, as one streaming pipeline.")
+    ap.add_argument("--regions", nargs="*", default=[r["name"] for r in REGIONS])
+    ap.add_argument("--patch", default=None, help="Keep only this patch (default: every patch)")
+    ap.add_argument("--max-puuids", type=int, default=300)
+    ap.add_argument("--max-per-summoner", type=int, default=5)
+    ap.add_argument("--flush-rows", type=int, default=200, help="Append to the store after this many matches...")
+    ap.add_argument("--flush-seconds", type=float, default=5.0, help="...or after this many seconds")
+    ap.add_argument("--queue-size", type=int, default=1000, help="Bound on in-flight payloads (backpressure)")
+    args = ap.parse_args()
+
+    if not API_KEY:
+        print("No RIOT_API_KEY found. Put it in .env")
+        return
+
+    raw_q = queue.Queue(maxsize=args.queue_size)
+    row_q = queue.Queue(maxsize=args.queue_size)
+    stop = threading.Event()
+    stats = {"written": 0, "max_latency": 0.0, "latency_sum": 0.0, "latency_n": 0}
+    regions = [r for r in REGIONS if r["name"] in args.regions]
+
+    def run_producer(r):
+        try:
+            produce(r, raw_q, args.max_puuids, args.max_per_summoner, stop)
+        finally:
+            raw_q.put(_DONE)
+
+    producers = [threading.Thread(target=run_producer, args=(r,), daemon=True) for r in regions]
+    consumer = threading.Thread(target=featurize, args=(raw_q, row_q, args.patch, len(producers)), daemon=True)
+    writer = threading.Thread(target=write, args=(row_q, args.flush_rows, args.flush_seconds, stats), daemon=True)
+    for t in producers + [consumer, writer]:
+        t.start()
+    try:
+        while writer.is_alive():
+            writer.join(timeout=1.0)
+    except KeyboardInterrupt:
+        print("Stopping after in-flight matches...")
+        stop.set()
+        writer.join()
+
+    mean = stats["latency_sum"] / stats["latency_n"] if stats["latency_n"] else 0.0
+    print(f"Stored {stats['written']} matches; fetch-to-store freshness mean {mean:.1f}s max {stats['max_latency']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
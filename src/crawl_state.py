@@ -0,0 +1,163 @@
+# src/crawl_state.py
+import hashlib, math, os, sqlite3
+import numpy as np
+
+# Lower rank = crawled first
+TIER_RANK = {"CHALLENGER": 0, "GRANDMASTER": 1, "MASTER": 2}
+UNKNOWN_TIER = 3
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a numpy bit array (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity=50_000_000, error_rate=0.01, bits=None, n_hashes=None):
+        self.n_bits = int(bits if bits is not None else math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.n_hashes = int(n_hashes if n_hashes is not None else max(1, round(self.n_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, key):
+        d = hashlib.blake2b(key.encode("utf8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= np.uint8(1 << (p & 7))
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def save(self, path, tag=0):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.array([self.n_bits, self.n_hashes, tag], dtype=np.int64))
+            np.save(f, self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Returns (filter, tag)."""
+        with open(path, "rb") as f:
+            n_bits, n_hashes, tag = np.load(f)
+            bf = cls(bits=int(n_bits), n_hashes=int(n_hashes), capacity=1)
+            bf.bits = np.load(f)
+        return bf, int(tag)
+
+
+class CrawlState:
+    """
+    Checkpointable crawl state in one sqlite file plus a Bloom filter sidecar:
+    - seen(kind, id): exact dedupe set for PUUIDs and match ids; the Bloom filter answers
+      "definitely new" without touching disk, sqlite settles the "maybe seen" cases
+    - frontier: PUUIDs to expand, popped by (tier rank, most recent match first)
+    - tiers: rank tier of every PUUID seen in the Master+ league lists
+    Nothing is held in memory except the Bloom bits and a small pop buffer.
+    """
+
+    def __init__(self, path, bloom_capacity=50_000_000, bloom_error=0.01):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.bloom_path = path + ".bloom"
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (kind TEXT, id TEXT, PRIMARY KEY (kind, id)) WITHOUT ROWID")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS frontier (puuid TEXT PRIMARY KEY, region TEXT, tier INTEGER, recency REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS frontier_prio ON frontier (tier, recency DESC)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS tiers (puuid TEXT PRIMARY KEY, tier INTEGER) WITHOUT ROWID")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+        self.bloom = None
+        epoch = int(self.get_meta("checkpoint", 0))
+        if os.path.exists(self.bloom_path):
+            self.bloom, tag = BloomFilter.load(self.bloom_path)
+            if tag != epoch:
+                # stopped between the sqlite commit and the Bloom save: rebuild from the exact set
+                self.bloom = None
+        if self.bloom is None:
+            self.bloom = BloomFilter(bloom_capacity, bloom_error)
+            for kind, key in self.db.execute("SELECT kind, id FROM seen"):
+                self.bloom.add(f"{kind}:{key}")
+
+    # -------------------------
+    # Dedupe
+    # -------------------------
+    def seen(self, kind, key):
+        k = f"{kind}:{key}"
+        if k not in self.bloom:
+            return False
+        row = self.db.execute("SELECT 1 FROM seen WHERE kind=? AND id=?", (kind, key)).fetchone()
+        return row is not None
+
+    def mark_seen(self, kind, key):
+        """Mark key seen; returns False if it already was."""
+        if self.seen(kind, key):
+            return False
+        self.db.execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (kind, key))
+        self.bloom.add(f"{kind}:{key}")
+        return True
+
+    def count_seen(self, kind):
+        return self.db.execute("SELECT COUNT(*) FROM seen WHERE kind=?", (kind,)).fetchone()[0]
+
+    # -------------------------
+    # Known rank tiers (from the league lists)
+    # -------------------------
+    def set_tiers(self, pairs):
+        self.db.executemany("INSERT OR REPLACE INTO tiers VALUES (?, ?)", pairs)
+
+    def tier_of(self, puuid):
+        row = self.db.execute("SELECT tier FROM tiers WHERE puuid=?", (puuid,)).fetchone()
+        return row[0] if row else UNKNOWN_TIER
+
+    # -------------------------
+    # Frontier
+    # -------------------------
+    def push(self, puuid, region, tier, recency):
+        """Queue a PUUID unless already expanded; keeps the best priority if queued twice."""
+        if self.seen("puuid", puuid):
+            return False
+        self.db.execute(
+            "INSERT INTO frontier VALUES (?, ?, ?, ?) ON CONFLICT(puuid) DO UPDATE SET "
+            "tier=MIN(tier, excluded.tier), recency=MAX(recency, excluded.recency)",
+            (puuid, region, tier, recency),
+        )
+        return True
+
+    def pop(self, n=1, regions=None):
+        """Remove and return up to n (puuid, region, tier, recency) in priority order."""
+        where, args = "", []
+        if regions:
+            where = f"WHERE region IN ({','.join('?' * len(regions))}) "
+            args = list(regions)
+        rows = self.db.execute(
+            f"SELECT puuid, region, tier, recency FROM frontier {where}ORDER BY tier, recency DESC LIMIT ?",
+            args + [n],
+        ).fetchall()
+        self.db.executemany("DELETE FROM frontier WHERE puuid=?", [(r[0],) for r in rows])
+        return rows
+
+    def frontier_size(self):
+        return self.db.execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    # -------------------------
+    # Checkpointing
+    # -------------------------
+    def set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def checkpoint(self):
+        epoch = int(self.get_meta("checkpoint", 0)) + 1
+        self.set_meta("checkpoint", epoch)
+        self.db.commit()
+        self.bloom.save(self.bloom_path, tag=epoch)
+
+    def close(self):
+        self.checkpoint()
+        self.db.close()
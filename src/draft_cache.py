@@ -0,0 +1,150 @@
+# src/draft_cache.py
+import os, time, threading
+from collections import OrderedDict
+import joblib
+from src.utils import CHAMP_TO_IDX
+
+
+def canonical_key(blue_champs, red_champs, model_version):
+    """Order-invariant key for a draft state: sorted blue/red index tuples + model version."""
+    # unknown champions are dropped, same as champs_to_signed_vector does
+    b = tuple(sorted(CHAMP_TO_IDX[c] for c in blue_champs if c in CHAMP_TO_IDX))
+    r = tuple(sorted(CHAMP_TO_IDX[c] for c in red_champs if c in CHAMP_TO_IDX))
+    return (b, r, model_version)
+
+
+def model_version(model_path):
+    """Version tag for a model file (name + mtime) so retrained models don't reuse stale entries."""
+    if not model_path or not os.path.exists(model_path):
+        return str(model_path)
+    return f"{os.path.basename(model_path)}@{int(os.path.getmtime(model_path))}"
+
+
+class DraftStateCache:
+    """Thread-safe LRU + TTL memo of P(Blue wins) per canonical draft state."""
+
+    def __init__(self, max_size=50000, ttl=None, persist_path=None):
+        self.max_size = max_size
+        self.ttl = ttl  # seconds, None = never expire
+        self.persist_path = persist_path
+        self._data = OrderedDict()  # key -> (prob, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dirty = 0  # entries added since last save
+        if persist_path:
+            self.load()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def get(self, key, record=True):
+        """Cached P(Blue) or None; record=False (background lookups) leaves hits/misses untouched."""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or self._expired(item[1], now):
+                if item is not None:
+                    del self._data[key]
+                    self.evictions += 1
+                if record:
+                    self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if record:
+                self.hits += 1
+            return item[0]
+
+    def put(self, key, prob):
+        with self._lock:
+            self._data[key] = (float(prob), time.time())
+            self._data.move_to_end(key)
+            self._dirty += 1
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, blue_champs, red_champs, version, compute_fn):
+        """Return cached P(Blue) for the draft, calling compute_fn(blue, red) on a miss."""
+        key = canonical_key(blue_champs, red_champs, version)
+        prob = self.get(key)
+        if prob is None:
+            prob = float(compute_fn(blue_champs, red_champs))
+            self.put(key, prob)
+        return prob
+
+    def get_or_compute_many(self, states, version, batch_fn, record=True):
+        """
+        P(Blue) for a list of (blue, red) drafts; all misses are scored with a single
+        batch_fn(blue_lists, red_lists) call. record=False keeps the lookups out of the hit rate.
+        """
+        keys = [canonical_key(b, r, version) for b, r in states]
+        out = [self.get(k, record) for k in keys]
+        miss = {}
+        for i, (k, p) in enumerate(zip(keys, out)):
+            if p is None:
+                miss.setdefault(k, []).append(i)
+        if miss:
+            firsts = [idx[0] for idx in miss.values()]
+            probs = batch_fn([states[i][0] for i in firsts], [states[i][1] for i in firsts])
+            for (k, idx), p in zip(miss.items(), probs):
+                self.put(k, p)
+                for i in idx:
+                    out[i] = float(p)
+        return out
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # -------------------------
+    # Disk persistence
+    # -------------------------
+    def save(self, path=None):
+        path = path or self.persist_path
+        if not path:
+            return
+        with self._lock:
+            snapshot = OrderedDict(self._data)
+            self._dirty = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(snapshot, tmp)
+        os.replace(tmp, path)
+
+    def flush(self, min_dirty=1):
+        """Persist to disk once at least min_dirty new entries have accumulated."""
+        if self.persist_path and self._dirty >= min_dirty:
+            self.save()
+
+    def load(self, path=None):
+        path = path or self.persist_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            snapshot = joblib.load(path)
+        except Exception as e:
+            print("Could not load draft cache:", e)
+            return
+        now = time.time()
+        with self._lock:
+            for k, (prob, stored_at) in snapshot.items():
+                if not self._expired(stored_at, now):
+                    self._data[k] = (prob, stored_at)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
@@ -0,0 +1,195 @@
+# src/ensemble.py
+import threading, time
+from contextlib import contextmanager
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from joblib import parallel_config
+from joblib.parallel import ThreadingBackend
+from sklearn.linear_model import LogisticRegression
+from src.utils import fit_width
+
+_SERIAL = threading.local()
+
+
+class _SingleThreadBackend(ThreadingBackend):
+    """joblib backend that runs every Parallel call inline, whatever n_jobs the model was saved with."""
+
+    def effective_n_jobs(self, n_jobs):
+        return 1
+
+
+@contextmanager
+def single_threaded():
+    """
+    Predict on the calling thread only: forests saved with n_jobs=-1 use one core and
+    BlendedEnsemble scores its members one after another. joblib's config is thread-local,
+    so other threads (e.g. the GUI's foreground predictions) keep their parallelism.
+    """
+    prev = getattr(_SERIAL, "on", False)
+    _SERIAL.on = True
+    try:
+        with parallel_config(backend=_SingleThreadBackend()):
+            yield
+    finally:
+        _SERIAL.on = prev
+
+
+def model_width(model):
+    """Champion count (signed-vector width) a model was trained with; None if it doesn't record one."""
+    for attr in ("n_features_in_", "num_champs"):
+        w = getattr(model, attr, None)
+        if w is not None:
+            return int(w)
+    members = getattr(model, "members", None)
+    if members:
+        widths = [w for w in map(model_width, members.values()) if w is not None]
+        return max(widths) if widths else None
+    return None
+
+
+def blue_column(model, X):
+    """P(class 1 = Blue) from any predict_proba model, even if it only saw one class."""
+    w = model_width(model)
+    if w is not None:
+        X = fit_width(X, w)
+    probs = model.predict_proba(X)
+    classes = list(getattr(model, "classes_", [0, 1]))
+    if 1 not in classes:
+        return np.zeros(len(X))
+    return probs[:, classes.index(1)]
+
+
+def _logit(p, eps=1e-4):
+    p = np.clip(p, eps, 1 - eps)
+    return np.log(p / (1 - p))
+
+
+class EmbedMember:
+    """predict_proba adapter so a saved CompEmbedNet can sit in an ensemble next to the forests."""
+
+    def __init__(self, state_dict_path):
+        self.state_dict_path = state_dict_path
+        self.classes_ = np.array([0, 1])
+        self._model = None
+
+    def __getstate__(self):
+        # store the path, not the torch module
+        state = self.__dict__.copy()
+        state["_model"] = None
+        return state
+
+    def predict_proba(self, X):
+        from src.train_embed import predict_embed_batch
+        if self._model is None:
+            from src.inference import load_embed_model
+            self._model = load_embed_model(self.state_dict_path)
+        p = predict_embed_batch(self._model, fit_width(X, self._model.embedding.num_embeddings))
+        return np.column_stack([1 - p, p])
+
+
+class BlendedEnsemble:
+    """
+    Blends member predictors in logit space: P(Blue) = sigmoid(bias + sum_i w_i * logit(p_i)).
+    Weights are learned by stacking (logistic regression on member logits). predict_proba scores
+    a batch through all members concurrently and records per-member latency.
+    """
+
+    def __init__(self, members, weights=None, bias=0.0):
+        self.members = dict(members)
+        names = list(self.members)
+        if weights is None:
+            weights = {n: 1.0 / len(names) for n in names}
+        self.weights = dict(weights)
+        self.bias = float(bias)
+        self.classes_ = np.array([0, 1])
+        self._reset_runtime()
+
+    @classmethod
+    def from_legacy(cls, members):
+        """Wrap the old {"base": rf, "world": rf_world} dict with equal weights."""
+        return cls(members)
+
+    def _reset_runtime(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._timings = {n: {"calls": 0, "rows": 0, "seconds": 0.0} for n in self.members}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for k in ("_lock", "_pool", "_timings"):
+            state.pop(k, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_runtime()
+
+    def _timed(self, name, X):
+        t0 = time.perf_counter()
+        p = blue_column(self.members[name], X)
+        dt = time.perf_counter() - t0
+        with self._lock:
+            t = self._timings[name]
+            t["calls"] += 1
+            t["rows"] += len(X)
+            t["seconds"] += dt
+        return p
+
+    def member_probas(self, X):
+        """P(Blue) from every member, computed concurrently; {name: (n,) array}."""
+        names = list(self.members)
+        if len(names) == 1 or getattr(_SERIAL, "on", False):
+            return {n: self._timed(n, X) for n in names}
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=len(names))
+        futures = {n: self._pool.submit(self._timed, n, X) for n in names}
+        return {n: f.result() for n, f in futures.items()}
+
+    def fit_weights(self, X=None, y=None, member_probas=None, C=1.0):
+        """
+        Learn blend weights from labelled data. Pass member_probas (e.g. out-of-fold
+        predictions for members trained on the same data) to avoid leaking training fit.
+        """
+        if member_probas is None:
+            member_probas = self.member_probas(X)
+        names = list(self.members)
+        Z = np.column_stack([_logit(member_probas[n]) for n in names])
+        lr = LogisticRegression(C=C)
+        lr.fit(Z, y)
+        self.weights = {n: float(w) for n, w in zip(names, lr.coef_[0])}
+        self.bias = float(lr.intercept_[0])
+        return self
+
+    def predict_proba(self, X):
+        probas = self.member_probas(X)
+        z = self.bias + sum(self.weights[n] * _logit(p) for n, p in probas.items())
+        p = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1 - p, p])
+
+    def timings(self):
+        """Per-member latency: calls, rows, total seconds and mean ms per call / per 1k rows."""
+        out = {}
+        with self._lock:
+            for n, t in self._timings.items():
+                out[n] = dict(t)
+                out[n]["ms_per_call"] = 1000 * t["seconds"] / t["calls"] if t["calls"] else 0.0
+                out[n]["ms_per_1k_rows"] = 1e6 * t["seconds"] / t["rows"] if t["rows"] else 0.0
+        return out
+
+
+if __name__ == "__main__":
+    # Compare members vs the blend on the Worlds set, with per-member latency
+    import os
+    from config import MODEL_DIR
+    from src.preprocess import load_worlds_data
+    from src.inference import load_rf_model
+
+    model = load_rf_model(os.path.join(MODEL_DIR, "rf_ensemble_world.joblib"))
+    Xw, yw = load_worlds_data()
+    probas = model.member_probas(Xw)
+    for n, p in probas.items():
+        print(f"{n:>6}: weight={model.weights[n]:+.3f} acc={np.mean((p >= 0.5) == yw):.4f}")
+    blend = model.predict_proba(Xw)[:, 1]
+    print(f" blend: bias={model.bias:+.3f} acc={np.mean((blend >= 0.5) == yw):.4f}  (in-sample)")
+    for n, t in model.timings().items():
+        print(f"{n:>6}: {t['ms_per_call']:.2f} ms/call, {t['ms_per_1k_rows']:.2f} ms per 1k rows")
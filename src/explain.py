@@ -0,0 +1,139 @@
+# src/explain.py
+import weakref
+import numpy as np
+import scipy.sparse as sp
+from sklearn.ensemble import RandomForestClassifier
+from src.utils import IDX_TO_CHAMP, champs_to_index_matrix, index_matrix_to_signed
+
+# forest -> ForestExplainer; weak keys, so forests evicted from the patch-model LRU are freed with
+# their explainers (which only hold a weak reference back)
+_EXPLAINERS = weakref.WeakKeyDictionary()
+
+
+def forest_for(model):
+    """The forest to explain: the model itself, or the base forest of a BlendedEnsemble."""
+    if isinstance(model, RandomForestClassifier):
+        return model
+    members = getattr(model, "members", None)
+    if members and isinstance(members.get("base"), RandomForestClassifier):
+        return members["base"]
+    raise TypeError(f"Cannot explain model of type {type(model).__name__}")
+
+
+class ForestExplainer:
+    """
+    Path-based decomposition of RF predictions (Saabas): walking a sample down a tree,
+    each split moves P(Blue) from the parent node's value to the child's, and that change
+    is credited to the split feature. Averaged over trees:
+        P(Blue) = bias + sum_f contrib[f]
+    The per-leaf sums of those credits are fixed, so they are precomputed once as a sparse
+    (all leaves x champions) matrix; a batch is then one apply() call (as cheap as predict)
+    and one sparse matmul with n_trees nonzeros per row.
+    """
+
+    def __init__(self, forest):
+        self._forest = weakref.ref(forest)
+        self.n_features = forest.n_features_in_
+        pos = list(forest.classes_).index(1) if 1 in forest.classes_ else None
+        rows, cols, vals, roots, offsets = [], [], [], [], []
+        offset = 0
+        for est in forest.estimators_:
+            t = est.tree_
+            value = t.value[:, 0, :]
+            p1 = value[:, pos] / value.sum(axis=1) if pos is not None else np.zeros(t.node_count)
+            roots.append(p1[0])
+            parent = np.full(t.node_count, -1)
+            internal = np.where(t.children_left >= 0)[0]
+            parent[t.children_left[internal]] = internal
+            parent[t.children_right[internal]] = internal
+            # walk every leaf up to the root together, one level per step
+            leaves = np.where(t.children_left < 0)[0]
+            node = leaves.copy()
+            while True:
+                live = parent[node] >= 0
+                if not live.any():
+                    break
+                n, up = node[live], parent[node[live]]
+                rows.append(leaves[live] + offset)
+                cols.append(t.feature[up])
+                vals.append(p1[n] - p1[up])
+                node = np.where(live, parent[node], node)
+            offsets.append(offset)
+            offset += t.node_count
+        n_trees = len(forest.estimators_)
+        # duplicate (leaf, feature) pairs -- a feature split twice on one path -- are summed
+        self.leaf_contrib = sp.csr_matrix(
+            (np.concatenate(vals) / n_trees, (np.concatenate(rows), np.concatenate(cols))),
+            shape=(offset, self.n_features),
+        )
+        self.offsets = np.asarray(offsets)
+        self.bias = float(np.mean(roots))
+
+    @property
+    def forest(self):
+        return self._forest()
+
+    def contributions(self, X, chunk_size=4096):
+        """Dense (n, n_features) contribution matrix for signed draft vectors X."""
+        out = np.empty((X.shape[0], self.n_features), dtype=np.float64)
+        n_trees = len(self.offsets)
+        for s in range(0, X.shape[0], chunk_size):
+            leaves = self.forest.apply(X[s:s + chunk_size]) + self.offsets[None, :]
+            m = leaves.shape[0]
+            indicator = sp.csr_matrix(
+                (np.ones(leaves.size), leaves.ravel(), np.arange(0, leaves.size + 1, n_trees)),
+                shape=(m, self.leaf_contrib.shape[0]),
+            )
+            out[s:s + m] = (indicator @ self.leaf_contrib).toarray()
+        return out
+
+    def explain_indices(self, blue_idx, red_idx, chunk_size=4096):
+        """
+        Per-pick breakdown for (n, 5) index arrays (-1 = empty slot). Returns
+        bias, blue (n, 5), red (n, 5), other (n,) and prob (n,) with
+        prob = bias + blue.sum(1) + red.sum(1) + other; "other" is the credit given to
+        splits on champions not in the draft.
+        """
+        X = index_matrix_to_signed(blue_idx, red_idx, self.n_features)
+        C = self.contributions(X, chunk_size)
+        rows = np.arange(len(X))[:, None]
+        # champions added to the index after training (id >= n_features) are unknown to the forest
+        W = self.n_features
+        blue = np.where((blue_idx >= 0) & (blue_idx < W), C[rows, np.clip(blue_idx, 0, W - 1)], 0.0)
+        red = np.where((red_idx >= 0) & (red_idx < W), C[rows, np.clip(red_idx, 0, W - 1)], 0.0)
+        total = C.sum(axis=1)
+        # a champion listed twice would be credited twice; keep only its first slot
+        for idx, contrib in ((blue_idx, blue), (red_idx, red)):
+            for j in range(1, idx.shape[1]):
+                dup = (idx[:, j:j + 1] == idx[:, :j]).any(axis=1) & (idx[:, j] >= 0)
+                contrib[dup, j] = 0.0
+        other = total - blue.sum(axis=1) - red.sum(axis=1)
+        return {"bias": self.bias, "blue": blue, "red": red, "other": other, "prob": self.bias + total}
+
+    def explain(self, blue_champs, red_champs):
+        """Single draft -> list of (champion, side, contribution) sorted by |contribution|, plus bias/other/prob."""
+        b = champs_to_index_matrix([blue_champs])
+        r = champs_to_index_matrix([red_champs])
+        res = self.explain_indices(b, r)
+        picks = []
+        for side, idx, contrib in (("Blue", b[0], res["blue"][0]), ("Red", r[0], res["red"][0])):
+            for i, c in zip(idx, contrib):
+                if i >= 0:
+                    picks.append((IDX_TO_CHAMP[int(i)], side, float(c)))
+        picks.sort(key=lambda x: abs(x[2]), reverse=True)
+        return {"bias": res["bias"], "picks": picks, "other": float(res["other"][0]), "prob": float(res["prob"][0])}
+
+
+def explainer_for(model):
+    """Cached ForestExplainer for a model (the leaf matrix is built once per loaded forest)."""
+    forest = forest_for(model)
+    ex = _EXPLAINERS.get(forest)
+    if ex is None:
+        ex = _EXPLAINERS[forest] = ForestExplainer(forest)
+    return ex
+
+
+def explain_draft(blue_champs, red_champs, model_path=None, patch=None):
+    """ForestExplainer.explain with the same model resolution as predict_rf."""
+    from src.inference import load_rf_model
+    return explainer_for(load_rf_model(model_path, patch=patch)).explain(blue_champs, red_champs)
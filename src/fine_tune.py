@@ -1,11 +1,13 @@
 # src/fine_tune.py
-import joblib, os
+import joblib, os, sys
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import KFold
 from src.preprocess import load_worlds_data, load_base_data
-from config import MODEL_DIR
+from src.ensemble import BlendedEnsemble, EmbedMember, blue_column
+from config import MODEL_DIR, RF_WORLD_PARAMS
 
-def fine_tune_rf():
+def fine_tune_rf(with_embed=False):
     # load base model
     rf_path = os.path.join(MODEL_DIR, "rf_base.joblib")
     rf = joblib.load(rf_path)
@@ -13,12 +15,29 @@ def fine_tune_rf():
     if len(yw) < 10:
         print("Too few worlds matches to fine-tune reliably:", len(yw))
     # simple approach: continue training by fitting a small RF on worlds and ensemble
-    rf_world = RandomForestClassifier(n_estimators=200, max_depth=10, random_state=42)
+    rf_world = RandomForestClassifier(**RF_WORLD_PARAMS, random_state=42)
+    members = {"base": rf, "world": rf_world}
+    embed_path = os.path.join(MODEL_DIR, "embed_base.pt")
+    if with_embed and os.path.exists(embed_path):
+        members["embed"] = EmbedMember(embed_path)
+    ensemble = BlendedEnsemble(members)
+
+    # learn blend weights on out-of-fold world-forest predictions so its training fit doesn't leak in
+    if len(yw) >= 10:
+        oof = np.zeros(len(yw))
+        for tr, te in KFold(n_splits=5, shuffle=True, random_state=42).split(Xw):
+            fold = RandomForestClassifier(**RF_WORLD_PARAMS, random_state=42).fit(Xw[tr], yw[tr])
+            oof[te] = blue_column(fold, Xw[te])
+        probas = {n: blue_column(m, Xw) for n, m in members.items() if n != "world"}
+        probas["world"] = oof
+        ensemble.fit_weights(member_probas=probas, y=yw)
+        print("Blend weights:", ensemble.weights, "bias:", round(ensemble.bias, 4))
+    else:
+        print("Using equal blend weights")
+
     rf_world.fit(Xw, yw)
-    # Save ensemble pair (base + world-specific)
-    joblib.dump({"base": rf, "world": rf_world}, os.path.join(MODEL_DIR, "rf_ensemble_world.joblib"))
+    joblib.dump(ensemble, os.path.join(MODEL_DIR, "rf_ensemble_world.joblib"))
     print("Saved rf ensemble")
 
 if __name__ == "__main__":
-    fine_tune_rf()
-
+    fine_tune_rf(with_embed="--embed" in sys.argv)
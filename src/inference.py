@@ -2,10 +2,15 @@
 import joblib
 import torch
 import json
+import os
+import threading
 import numpy as np
+from collections import OrderedDict
 from pathlib import Path
-from config import MODEL_DIR, CHAMP_INDEX_PATH
-from src.utils import champs_to_signed_vector, parse_champion_list
+from config import MODEL_DIR, CHAMP_INDEX_PATH, PATCH_MODEL_DIR, PATCH_MODEL_CACHE_SIZE
+from src.utils import champs_to_signed_vector, parse_champion_list, patch_key, champs_to_index_matrix, index_matrix_to_signed
+from src.train_embed import CompEmbedNet
+from src.ensemble import BlendedEnsemble, blue_column, model_width
 
 # Load champion index
 with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
@@ -13,31 +18,139 @@ with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
 NUM_CHAMPS = len(CHAMP_TO_IDX)
 
 
+# -------------------------
+# Patch-keyed model registry
+# -------------------------
+def load_embed_model(path, device=None):
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    state = torch.load(path, map_location=device)
+    # size the net from the saved table, not from the current config / index: emb_dim may have
+    # been retuned and the champion index may have grown since this model was trained
+    num_champs, emb_dim = state["embedding.weight"].shape
+    model = CompEmbedNet(num_champs, emb_dim=emb_dim).to(device)
+    model.load_state_dict(state)
+    model.eval()
+    return model
+
+
+class PatchModelRegistry:
+    """
+    Lazily loads per-patch models from PATCH_MODEL_DIR/<patch>/ and keeps at most
+    `max_loaded` of them in memory (LRU). Requests for a patch without its own model
+    are routed to the nearest earlier patch that has one.
+    """
+
+    FILES = {"rf": "rf_base.joblib", "embed": "embed_base.pt"}
+
+    def __init__(self, root=PATCH_MODEL_DIR, max_loaded=PATCH_MODEL_CACHE_SIZE):
+        self.root = root
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()  # (patch, kind) -> model
+        self._lock = threading.Lock()
+
+    def available(self, kind="rf"):
+        if not os.path.isdir(self.root):
+            return []
+        fname = self.FILES[kind]
+        patches = [p for p in os.listdir(self.root) if os.path.exists(os.path.join(self.root, p, fname))]
+        return sorted(patches, key=patch_key)
+
+    def resolve(self, patch, kind="rf"):
+        """Exact patch if trained, else the nearest earlier one; None if there is none."""
+        target = patch_key(patch)
+        best = None
+        for p in self.available(kind):
+            if patch_key(p) <= target:
+                best = p
+        return best
+
+    def get(self, patch, kind="rf"):
+        resolved = self.resolve(patch, kind)
+        if resolved is None:
+            raise RuntimeError(f"No {kind} model for patch {patch} or any earlier patch in {self.root}")
+        key = (resolved, kind)
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+        path = os.path.join(self.root, resolved, self.FILES[kind])
+        # fallback patches are the ones most likely to predate newly added champions: RFs carry
+        # their width as n_features_in_, embed nets are sized from their saved table
+        model = joblib.load(path) if kind == "rf" else load_embed_model(path)
+        with self._lock:
+            self._loaded[key] = model
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return model
+
+
+_REGISTRY = None
+
+
+def get_patch_registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = PatchModelRegistry()
+    return _REGISTRY
+
+
 # -------------------------
 # Random Forest Prediction
 # -------------------------
-def predict_rf(blue_champs, red_champs, model_path=None):
-    """Predict which team wins using Random Forest model."""
+_LOADED = {}  # model file -> (mtime, model); keeps ensemble timings across calls
+
+
+def load_rf_model(model_path=None, patch=None):
+    """Load the RF model: the patch-routed one if `patch` is given, else model_path / the Worlds ensemble."""
     try:
+        if patch is not None and model_path is None:
+            return get_patch_registry().get(patch, "rf")
         model_file = Path(model_path) if model_path else Path(MODEL_DIR) / "rf_ensemble_world.joblib"
+        mtime = model_file.stat().st_mtime
+        cached = _LOADED.get(str(model_file))
+        if cached and cached[0] == mtime:
+            return cached[1]
         model = joblib.load(model_file)
+        if isinstance(model, dict):
+            # older fine_tune output: {"base": rf, "world": rf_world}
+            model = BlendedEnsemble.from_legacy(model)
+        _LOADED[str(model_file)] = (mtime, model)
+        return model
     except Exception as e:
         raise RuntimeError(f"Could not load model: {e}")
 
+
+def predict_rf_proba(blue_champs, red_champs, model_path=None, patch=None):
+    """Return raw P(Blue wins) in [0, 1] from the Random Forest model."""
+    model = load_rf_model(model_path, patch=patch)
+
     # Convert champions to signed vector (+1 for blue, -1 for red)
     try:
-        v = champs_to_signed_vector(blue_champs, red_champs).reshape(1, -1)
+        v = champs_to_signed_vector(blue_champs, red_champs, model_width(model)).reshape(1, -1)
     except Exception as e:
         raise RuntimeError(f"Vectorization failed: {e}")
 
     # Predict probabilities
     try:
         probs = model.predict_proba(v)[0]
-        blue_prob = float(probs[1])  # assuming class 1 = Blue
-        red_prob = float(probs[0])
+        return float(probs[1])  # assuming class 1 = Blue
     except Exception as e:
         raise RuntimeError(f"Prediction failed: {e}")
 
+
+def predict_rf_proba_batch(blue_lists, red_lists, model_path=None, patch=None):
+    """P(Blue wins) for many drafts with one predict_proba call."""
+    model = load_rf_model(model_path, patch=patch)
+    X = index_matrix_to_signed(champs_to_index_matrix(blue_lists), champs_to_index_matrix(red_lists),
+                               model_width(model))
+    return blue_column(model, X)
+
+
+def predict_rf(blue_champs, red_champs, model_path=None, patch=None):
+    """Predict which team wins using Random Forest model."""
+    blue_prob = predict_rf_proba(blue_champs, red_champs, model_path=model_path, patch=patch)
+    red_prob = 1 - blue_prob
+
     winner = "Blue Side Wins" if blue_prob >= red_prob else "Red Side Wins"
     confidence = abs(blue_prob - red_prob)
 
@@ -52,31 +165,19 @@ def predict_rf(blue_champs, red_champs, model_path=None):
 # -------------------------
 # Embedding Model Prediction
 # -------------------------
-class CompEmbedNet(torch.nn.Module):
-    def __init__(self, num_champs, emb_dim=64):
-        super().__init__()
-        self.emb = torch.nn.Embedding(num_champs, emb_dim)
-        self.fc = torch.nn.Linear(emb_dim * 10 + 1, 1)
-        self.sigmoid = torch.nn.Sigmoid()
-
-    def forward(self, blue_idx, red_idx, side_flag):
-        b = self.emb(blue_idx).view(blue_idx.size(0), -1)
-        r = self.emb(red_idx).view(red_idx.size(0), -1)
-        x = torch.cat([b, r, side_flag.unsqueeze(1)], dim=1)
-        return self.sigmoid(self.fc(x))
-
-
-def predict_embed(blue_champs, red_champs, model=None, device=None):
+def predict_embed(blue_champs, red_champs, model=None, device=None, patch=None):
     """Predict win chance using embedding neural network model."""
     if model is None:
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        model = CompEmbedNet(NUM_CHAMPS, emb_dim=64).to(device)
-        model.load_state_dict(torch.load(f"{MODEL_DIR}/embed_base.pt", map_location=device))
-        model.eval()
+        if patch is not None:
+            model = get_patch_registry().get(patch, "embed")
+        else:
+            model = load_embed_model(f"{MODEL_DIR}/embed_base.pt", device)
+
+    # Convert champ names to indices (champions newer than the embedding table count as unknown)
+    width = model.embedding.num_embeddings
 
-    # Convert champ names to indices
     def to_idx_list(champs):
-        out = [CHAMP_TO_IDX.get(c, 0) for c in champs]
+        out = [i if i < width else 0 for i in (CHAMP_TO_IDX.get(c, 0) for c in champs)]
         while len(out) < 5:
             out.append(0)
         return out[:5]
@@ -0,0 +1,142 @@
+# src/match_store.py
+import glob, os, uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import MATCH_STORE_DIR
+from src.utils import champs_to_index_matrix, extend_champ_index, parse_champion_list, patch_key
+
+# Layout: MATCH_STORE_DIR/patch=<patch>/region=<region>/part-<uuid>.parquet
+# Each part holds match_id, winner (1 = Blue) and one int16 champion-index column per pick slot
+# (-1 = empty slot). Parts are only ever added, never rewritten.
+BLUE_COLS = [f"blue{i}" for i in range(1, 6)]
+RED_COLS = [f"red{i}" for i in range(1, 6)]
+SLOT_COLS = BLUE_COLS + RED_COLS
+SCHEMA = pa.schema(
+    [("match_id", pa.string()), ("winner", pa.int8())] + [(c, pa.int16()) for c in SLOT_COLS]
+)
+
+
+def partition_dir(patch, region, root=MATCH_STORE_DIR):
+    return os.path.join(root, f"patch={patch}", f"region={region}")
+
+
+def list_partitions(root=MATCH_STORE_DIR):
+    """All (patch, region) pairs present in the store, oldest patch first ("15.9" before "15.10")."""
+    out = []
+    for d in glob.glob(os.path.join(root, "patch=*", "region=*")):
+        region_part = os.path.basename(d)
+        patch_part = os.path.basename(os.path.dirname(d))
+        out.append((patch_part.split("=", 1)[1], region_part.split("=", 1)[1]))
+    return sorted(out, key=lambda pr: (patch_key(pr[0]), pr[1]))
+
+
+def _partition_files(patches=None, regions=None, root=MATCH_STORE_DIR):
+    files = []
+    for patch, region in list_partitions(root):
+        if patches is not None and patch not in patches:
+            continue
+        if regions is not None and region not in regions:
+            continue
+        for f in sorted(glob.glob(os.path.join(partition_dir(patch, region, root), "*.parquet"))):
+            files.append((patch, region, f))
+    return files
+
+
+def _existing_match_ids(patch, region, root=MATCH_STORE_DIR):
+    ids = set()
+    for f in glob.glob(os.path.join(partition_dir(patch, region, root), "*.parquet")):
+        ids.update(pq.read_table(f, columns=["match_id"]).column("match_id").to_pylist())
+    return ids
+
+
+def featurize_rows(df):
+    """match_id / patch / champion-name lists / winner -> store columns (int slot ids, winner 1 = Blue)."""
+    blue = [parse_champion_list(s) for s in df["blue_champs"]]
+    red = [parse_champion_list(s) for s in df["red_champs"]]
+    extend_champ_index([c for lst in blue + red for c in lst])
+    b_idx = champs_to_index_matrix(blue).astype(np.int16)
+    r_idx = champs_to_index_matrix(red).astype(np.int16)
+    out = pd.DataFrame({
+        "match_id": df["match_id"].astype(str).values,
+        "patch": df["patch"].astype(str).values,
+        "winner": (df["winner"] == "Blue").astype(np.int8).values,
+    })
+    for j, c in enumerate(BLUE_COLS):
+        out[c] = b_idx[:, j]
+    for j, c in enumerate(RED_COLS):
+        out[c] = r_idx[:, j]
+    return out
+
+
+def append_featurized(df, region, root=MATCH_STORE_DIR, known_ids=None):
+    """
+    Append already-featurized rows (featurize_rows output) as new part files, one per patch.
+    Long-running writers can pass a dict as known_ids to keep per-partition match ids in
+    memory instead of re-reading them from disk on every append.
+    """
+    if df.empty:
+        return 0
+    df = df.drop_duplicates(subset=["match_id"])
+    written = 0
+    for patch, g in df.groupby("patch", sort=False):
+        if known_ids is None:
+            seen = _existing_match_ids(patch, region, root)
+        else:
+            if (patch, region) not in known_ids:
+                known_ids[(patch, region)] = _existing_match_ids(patch, region, root)
+            seen = known_ids[(patch, region)]
+        g = g[~g["match_id"].isin(seen)]
+        if g.empty:
+            continue
+        table = pa.Table.from_pandas(g[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+        out_dir = partition_dir(patch, region, root)
+        os.makedirs(out_dir, exist_ok=True)
+        pq.write_table(table, os.path.join(out_dir, f"part-{uuid.uuid4().hex}.parquet"))
+        if known_ids is not None:
+            seen.update(g["match_id"])
+        written += len(g)
+    return written
+
+
+def append_matches(rows, region, root=MATCH_STORE_DIR):
+    """
+    Append match rows (dicts/DataFrame with match_id, patch, blue_champs, red_champs, winner)
+    to the store as new part files, one per patch. Matches already stored in the same
+    partition are skipped. Returns the number of rows written.
+    """
+    df = pd.DataFrame(rows) if not isinstance(rows, pd.DataFrame) else rows
+    if df.empty:
+        return 0
+    df = df.dropna(subset=["match_id", "winner"])
+    return append_featurized(featurize_rows(df), region, root)
+
+
+def load_matches(patches=None, regions=None, columns=None, root=MATCH_STORE_DIR):
+    """
+    Read the requested partitions (None = all) and columns (None = all stored columns)
+    into a DataFrame; patch and region are added from the partition path.
+    """
+    cols = list(columns) if columns is not None else SCHEMA.names
+    file_cols = [c for c in cols if c in SCHEMA.names]
+    frames = []
+    for patch, region, f in _partition_files(patches, regions, root):
+        part = pq.read_table(f, columns=file_cols).to_pandas()
+        if "patch" in cols:
+            part["patch"] = patch
+        if "region" in cols:
+            part["region"] = region
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=cols)
+    return pd.concat(frames, ignore_index=True)[cols]
+
+
+def load_index_arrays(patches=None, regions=None, root=MATCH_STORE_DIR):
+    """Return (blue_idx (n,5), red_idx (n,5), y) straight from the integer slot columns."""
+    df = load_matches(patches, regions, columns=["winner"] + SLOT_COLS, root=root)
+    blue_idx = df[BLUE_COLS].to_numpy(dtype=np.int64)
+    red_idx = df[RED_COLS].to_numpy(dtype=np.int64)
+    y = df["winner"].to_numpy(dtype=np.int64)
+    return blue_idx, red_idx, y
@@ -0,0 +1,136 @@
+# src/ooc_models.py
+import numpy as np
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier
+from src.utils import signed_to_index_matrix
+
+# Models trained by src/train_ooc.py. They live in their own module so saved models unpickle
+# under src.ooc_models whichever script trained them. predict_proba takes signed vectors, like
+# the RF, so inference can load them as-is.
+
+
+def _tri(lo, hi, C):
+    """Column of the unordered pair lo < hi among C champions."""
+    return lo * C - lo * (lo + 1) // 2 + (hi - lo - 1)
+
+
+def pair_features(blue_idx, red_idx, num_champs):
+    """
+    Sparse features per draft: signed champion one-hot (+blue/-red), team synergy pairs
+    (+1 blue pair, -1 red pair) and blue-vs-red counter pairs (antisymmetric: a vs b = -(b vs a)).
+    55 stored entries per row; empty slots and champions newer than the model are zeroed.
+    """
+    C = num_champs
+    P = C * (C - 1) // 2
+    n = len(blue_idx)
+    ok_b = (blue_idx >= 0) & (blue_idx < C)
+    ok_r = (red_idx >= 0) & (red_idx < C)
+    b = np.where(ok_b, blue_idx, 0)
+    r = np.where(ok_r, red_idx, 0)
+    cols, vals = [b, r], [ok_b * 1.0, ok_r * -1.0]
+    iu, ju = np.triu_indices(5, k=1)
+    for idx, ok, sign in ((b, ok_b, 1.0), (r, ok_r, -1.0)):
+        lo = np.minimum(idx[:, iu], idx[:, ju])
+        hi = np.maximum(idx[:, iu], idx[:, ju])
+        valid = ok[:, iu] & ok[:, ju] & (lo != hi)
+        cols.append(C + np.where(valid, _tri(lo, np.maximum(hi, lo + 1), C), 0))
+        vals.append(valid * sign)
+    bb = np.repeat(b, 5, axis=1)
+    rr = np.tile(r, (1, 5))
+    valid = np.repeat(ok_b, 5, axis=1) & np.tile(ok_r, (1, 5)) & (bb != rr)
+    lo, hi = np.minimum(bb, rr), np.maximum(bb, rr)
+    cols.append(C + P + np.where(valid, _tri(lo, np.maximum(hi, lo + 1), C), 0))
+    vals.append(valid * np.where(bb < rr, 1.0, -1.0))
+    cols = np.hstack(cols)
+    vals = np.hstack(vals)
+    k = cols.shape[1]
+    X = sp.csr_matrix((vals.ravel(), cols.ravel(), np.arange(0, n * k + 1, k)), shape=(n, C + 2 * P))
+    X.eliminate_zeros()
+    return X
+
+
+class PairLinearModel:
+    """Logistic regression (SGD, partial_fit) over champion + synergy + counter pair features."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, num_champs, alpha=1e-4, batch_size=8192, seed=42):
+        self.num_champs = num_champs
+        self.batch_size = batch_size
+        self.clf = SGDClassifier(loss="log_loss", alpha=alpha, learning_rate="optimal", random_state=seed)
+
+    def partial_fit(self, blue_idx, red_idx, y):
+        # featurize per mini-batch so the sparse pair matrix never spans a whole chunk
+        for s0 in range(0, len(y), self.batch_size):
+            sl = slice(s0, s0 + self.batch_size)
+            self.clf.partial_fit(pair_features(blue_idx[sl], red_idx[sl], self.num_champs), y[sl],
+                                 classes=self.classes_)
+        return self
+
+    def predict_proba_idx(self, blue_idx, red_idx):
+        return self.clf.predict_proba(pair_features(blue_idx, red_idx, self.num_champs))
+
+    def predict_proba(self, X):
+        return self.predict_proba_idx(*signed_to_index_matrix(X))
+
+
+class FactorizationMachine:
+    """
+    Second-order FM with logistic loss over 2C one-hot inputs (blue slot features, then red),
+    so its factorized interactions cover blue synergy, red synergy and counters. Works on the
+    (n, 5) index arrays directly -- each draft has at most 10 active inputs -- and trains
+    with mini-batch AdaGrad.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, num_champs, dim=16, lr=0.05, reg=1e-5, batch_size=1024, seed=42):
+        rng = np.random.default_rng(seed)
+        self.num_champs = num_champs
+        self.lr, self.reg, self.batch_size = lr, reg, batch_size
+        self.w0 = 0.0
+        self.w = np.zeros(2 * num_champs)
+        self.V = rng.normal(0, 0.01, (2 * num_champs, dim))
+        self._g0, self._gw, self._gV = 1e-8, np.full_like(self.w, 1e-8), np.full_like(self.V, 1e-8)
+
+    def _inputs(self, blue_idx, red_idx):
+        C = self.num_champs
+        F = np.hstack([blue_idx, np.where(red_idx >= 0, red_idx + C, -1)])
+        mask = (F >= 0) & (np.hstack([blue_idx, red_idx]) < C)
+        return np.where(mask, F, 0), mask.astype(np.float64)
+
+    def _forward(self, F, m):
+        Vf = self.V[F] * m[..., None]
+        s = Vf.sum(axis=1)
+        logit = self.w0 + (self.w[F] * m).sum(axis=1) + 0.5 * (s ** 2 - (Vf ** 2).sum(axis=1)).sum(axis=1)
+        return logit, Vf, s
+
+    def partial_fit(self, blue_idx, red_idx, y):
+        F_all, m_all = self._inputs(blue_idx, red_idx)
+        for s0 in range(0, len(y), self.batch_size):
+            F, m, yb = F_all[s0:s0 + self.batch_size], m_all[s0:s0 + self.batch_size], y[s0:s0 + self.batch_size]
+            logit, Vf, s = self._forward(F, m)
+            g = (1.0 / (1.0 + np.exp(-logit)) - yb) / len(yb)
+            # gradients land on the <=10 active rows of w and V per draft
+            gw = np.zeros_like(self.w)
+            np.add.at(gw, F.ravel(), (g[:, None] * m).ravel())
+            gV = np.zeros_like(self.V)
+            np.add.at(gV, F.ravel(), ((g[:, None, None] * (s[:, None, :] - Vf)) * m[..., None]).reshape(-1, self.V.shape[1]))
+            g0 = g.sum()
+            gw += self.reg * self.w
+            gV += self.reg * self.V
+            self._g0 += g0 ** 2
+            self._gw += gw ** 2
+            self._gV += gV ** 2
+            self.w0 -= self.lr * g0 / np.sqrt(self._g0)
+            self.w -= self.lr * gw / np.sqrt(self._gw)
+            self.V -= self.lr * gV / np.sqrt(self._gV)
+        return self
+
+    def predict_proba_idx(self, blue_idx, red_idx):
+        logit, _, _ = self._forward(*self._inputs(blue_idx, red_idx))
+        p = 1.0 / (1.0 + np.exp(-logit))
+        return np.column_stack([1 - p, p])
+
+    def predict_proba(self, X):
+        return self.predict_proba_idx(*signed_to_index_matrix(X))
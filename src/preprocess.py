@@ -1,7 +1,7 @@
 # src/preprocess.py
 import pandas as pd
 import numpy as np
-from src.utils import champs_to_signed_vector, parse_champion_list
+from src.utils import champs_to_signed_vector, parse_champion_list, index_matrix_to_signed
 from config import BASE_CSV, WORLDS_CSV
 import joblib
 
@@ -33,3 +33,10 @@ def load_worlds_data():
     y = np.array(y)
     return X, y
 
+
+def load_store_data(patches=None, regions=None):
+    """Like load_base_data, but from the partitioned match store (only the requested partitions)."""
+    from src.match_store import load_index_arrays
+    blue_idx, red_idx, y = load_index_arrays(patches, regions)
+    X = index_matrix_to_signed(blue_idx, red_idx)
+    return X, y
@@ -0,0 +1,117 @@
+# src/rollout.py
+import os, time
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from config import BASE_CSV
+from src.utils import CHAMP_TO_IDX, champs_to_index_matrix, index_matrix_to_signed, parse_champion_list
+from src.ensemble import blue_column, model_width
+
+
+class PickPriors:
+    """Per-champion pick-rate prior (additively smoothed) used to sample draft completions."""
+
+    def __init__(self, counts, alpha=1.0):
+        counts = np.asarray(counts, dtype=np.float64) + alpha
+        self.probs = counts / counts.sum()
+        self.log_probs = np.log(self.probs)
+
+    @classmethod
+    def from_store(cls, patch=None, regions=None, alpha=1.0):
+        from src.match_store import load_index_arrays
+        b, r, _ = load_index_arrays([patch] if patch else None, regions)
+        picks = np.concatenate([b.ravel(), r.ravel()])
+        return cls(np.bincount(picks[picks >= 0], minlength=len(CHAMP_TO_IDX)), alpha)
+
+    @classmethod
+    def from_csv(cls, path=BASE_CSV, patch=None, alpha=1.0):
+        # dtype=str: read as a float, "15.20" would become 15.2 and never match the patch filter
+        df = pd.read_csv(path, dtype={"patch": str})
+        if patch is not None:
+            df = df[df["patch"].astype(str) == str(patch)]
+        teams = [parse_champion_list(s) for s in pd.concat([df["blue_champs"], df["red_champs"]])]
+        idx = champs_to_index_matrix(teams).ravel()
+        return cls(np.bincount(idx[idx >= 0], minlength=len(CHAMP_TO_IDX)), alpha)
+
+
+@lru_cache(maxsize=32)
+def get_priors(patch=None):
+    """Priors for a patch from the match store, falling back to BASE_CSV, then to uniform."""
+    try:
+        priors = PickPriors.from_store(patch)
+        if priors.probs.size and np.ptp(priors.probs) > 0:
+            return priors
+    except Exception:
+        pass
+    if os.path.exists(BASE_CSV):
+        return PickPriors.from_csv(BASE_CSV, patch)
+    return PickPriors(np.zeros(len(CHAMP_TO_IDX)))
+
+
+def sample_completions(blue_idx, red_idx, priors, n, rng):
+    """
+    Fill the empty (-1) slots of one partial draft n times, without replacement and in
+    proportion to the prior, via the Gumbel-top-k trick (one vectorized draw for all rollouts).
+    """
+    empty_b = np.where(blue_idx < 0)[0]
+    empty_r = np.where(red_idx < 0)[0]
+    k = len(empty_b) + len(empty_r)
+    B = np.tile(blue_idx, (n, 1))
+    R = np.tile(red_idx, (n, 1))
+    if k == 0:
+        return B, R
+    logits = priors.log_probs.copy()
+    taken = np.concatenate([blue_idx[blue_idx >= 0], red_idx[red_idx >= 0]])
+    logits[taken] = -np.inf
+    keys = logits[None, :] + rng.gumbel(size=(n, len(logits)))
+    top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    # order the k picks by key so they form a sequential weighted sample, then deal them out
+    order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+    picks = np.take_along_axis(top, order, axis=1)
+    B[:, empty_b] = picks[:, :len(empty_b)]
+    R[:, empty_r] = picks[:, len(empty_b):]
+    return B, R
+
+
+def rollout_win_prob(model, blue_champs, red_champs, priors, n_samples=1024, time_budget=None,
+                     batch_size=512, z=1.96, seed=None):
+    """
+    Expected P(Blue wins) over random completions of a partial draft, with a normal-approximation
+    confidence interval. Stops at n_samples or when time_budget (seconds) runs out, whichever
+    is first; at least one batch is always scored.
+    """
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    width = model_width(model)
+    b = champs_to_index_matrix([blue_champs])[0]
+    r = champs_to_index_matrix([red_champs])[0]
+    if (b >= 0).all() and (r >= 0).all():
+        p = float(blue_column(model, index_matrix_to_signed(b[None, :], r[None, :], width))[0])
+        return {"blue_prob": p, "ci_low": p, "ci_high": p, "n_samples": 1, "seconds": time.perf_counter() - t0}
+
+    probs = []
+    done = 0
+    while done < n_samples:
+        n = min(batch_size, n_samples - done)
+        B, R = sample_completions(b, r, priors, n, rng)
+        probs.append(blue_column(model, index_matrix_to_signed(B, R, width)))
+        done += n
+        if time_budget is not None and time.perf_counter() - t0 >= time_budget:
+            break
+    probs = np.concatenate(probs)
+    mean = float(probs.mean())
+    half = z * float(probs.std(ddof=1)) / np.sqrt(len(probs)) if len(probs) > 1 else 0.0
+    return {
+        "blue_prob": mean,
+        "ci_low": float(max(0.0, mean - half)),
+        "ci_high": float(min(1.0, mean + half)),
+        "n_samples": int(len(probs)),
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def predict_rollout(blue_champs, red_champs, model_path=None, patch=None, **kwargs):
+    """rollout_win_prob with the same model resolution as predict_rf."""
+    from src.inference import load_rf_model
+    model = load_rf_model(model_path, patch=patch)
+    return rollout_win_prob(model, blue_champs, red_champs, get_priors(patch), **kwargs)
@@ -0,0 +1,214 @@
+# src/similarity.py
+import argparse
+import numpy as np
+from config import MODEL_DIR
+from src.utils import CHAMP_TO_IDX, IDX_TO_CHAMP, champs_to_index_matrix
+
+
+def l2_normalize(M, eps=1e-8):
+    M = np.asarray(M, dtype=np.float32)
+    return M / np.maximum(np.linalg.norm(M, axis=-1, keepdims=True), eps)
+
+
+def topk_rows(S, k):
+    """Indices and scores of the k largest entries per row of S, sorted descending."""
+    k = min(k, S.shape[1])
+    part = np.argpartition(-S, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(S, part, axis=1)
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def load_embedding_weights(path=None):
+    """Per-champion embedding table from a trained CompEmbedNet state dict."""
+    import torch
+    state = torch.load(path or f"{MODEL_DIR}/embed_base.pt", map_location="cpu")
+    return state["embedding.weight"].numpy()
+
+
+class ChampionSimilarityIndex:
+    """Cosine nearest-neighbour lookups over L2-normalized champion embeddings."""
+
+    def __init__(self, weights):
+        self.vectors = l2_normalize(weights)  # (C, d)
+        # extra zero row so -1 (empty slot) gathers a null vector
+        self._padded = np.vstack([self.vectors, np.zeros((1, self.vectors.shape[1]), dtype=np.float32)])
+
+    @classmethod
+    def from_model(cls, path=None):
+        return cls(load_embedding_weights(path))
+
+    def similar_champions(self, champs, k=5, exclude=()):
+        """
+        Top-k substitutes for each champion in `champs` (one batched matmul); excludes itself and
+        `exclude`. Champions unknown to the embedding table (unindexed, or added to the index after
+        the model was trained) get an empty hit list.
+        """
+        C = len(self.vectors)
+        ids = [CHAMP_TO_IDX.get(c, C) for c in champs]
+        known = [i for i, j in enumerate(ids) if j < C]
+        out = [[] for _ in champs]
+        if not known:
+            return out
+        idx = np.array([ids[i] for i in known], dtype=np.int64)
+        S = self.vectors[idx] @ self.vectors.T  # (m, C)
+        S[np.arange(len(idx)), idx] = -np.inf
+        ex = [j for j in (CHAMP_TO_IDX.get(c, C) for c in exclude) if j < C]
+        if ex:
+            S[:, ex] = -np.inf
+        top, scores = topk_rows(S, k)
+        for i, row_i, row_s in zip(known, top, scores):
+            out[i] = [(IDX_TO_CHAMP[int(j)], float(s)) for j, s in zip(row_i, row_s) if np.isfinite(s)]
+        return out
+
+    def comp_vectors(self, team_idx):
+        """
+        Mean-pooled, re-normalized composition vectors for an (n, 5) index array (-1 = empty).
+        Champions newer than the embedding table count as empty slots.
+        """
+        team_idx = np.asarray(team_idx, dtype=np.int64)
+        ok = (team_idx >= 0) & (team_idx < len(self.vectors))
+        gathered = self._padded[np.where(ok, team_idx, len(self.vectors))]  # (n, 5, d)
+        counts = np.maximum(ok.sum(axis=1, keepdims=True), 1)
+        return l2_normalize(gathered.sum(axis=1) / counts)
+
+
+class CompositionIndex:
+    """
+    Nearest-historical-composition search. Exact search is a chunked matrix product over all
+    stored compositions; build_ivf() adds an inverted-file (k-means) structure for approximate
+    search that only scans the `nprobe` closest clusters.
+    """
+
+    def __init__(self, champ_index, team_idx, labels=None, chunk_size=262144):
+        self.champ_index = champ_index
+        self.team_idx = np.asarray(team_idx, dtype=np.int16)
+        self.labels = np.asarray(labels) if labels is not None else np.arange(len(team_idx))
+        self.matrix = champ_index.comp_vectors(team_idx)  # (n, d) float32
+        self.chunk_size = chunk_size
+        self.centroids = None
+        self._list_order = None
+        self._list_offsets = None
+
+    @classmethod
+    def from_store(cls, champ_index, patches=None, regions=None):
+        """Both sides of every stored draft become a composition, labelled '<match_id>:blue|red'."""
+        from src.match_store import load_matches, BLUE_COLS, RED_COLS
+        df = load_matches(patches, regions, columns=["match_id"] + BLUE_COLS + RED_COLS)
+        teams = np.vstack([df[BLUE_COLS].to_numpy(np.int64), df[RED_COLS].to_numpy(np.int64)])
+        ids = df["match_id"].astype(str)
+        labels = np.concatenate([(ids + ":blue").values, (ids + ":red").values])
+        return cls(champ_index, teams, labels)
+
+    def _queries(self, teams):
+        return self.champ_index.comp_vectors(champs_to_index_matrix(teams))
+
+    def query(self, teams, k=10):
+        """Exact top-k for a batch of teams (lists of champion names)."""
+        Q = self._queries(teams)
+        best_i = np.empty((len(Q), 0), dtype=np.int64)
+        best_s = np.empty((len(Q), 0), dtype=np.float32)
+        for start in range(0, len(self.matrix), self.chunk_size):
+            S = Q @ self.matrix[start:start + self.chunk_size].T
+            i, s = topk_rows(S, k)
+            best_i = np.hstack([best_i, i + start])
+            best_s = np.hstack([best_s, s])
+            if best_i.shape[1] > k:
+                keep, best_s = topk_rows(best_s, k)
+                best_i = np.take_along_axis(best_i, keep, axis=1)
+        return self._format(best_i, best_s)
+
+    def build_ivf(self, n_lists=1024, iters=10, sample_size=200000, seed=42):
+        """Spherical k-means coarse quantizer; rows are grouped by cluster for contiguous scans."""
+        rng = np.random.default_rng(seed)
+        n = len(self.matrix)
+        n_lists = min(n_lists, n)
+        sample = self.matrix[rng.choice(n, size=min(sample_size, n), replace=False)]
+        C = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(sample @ C.T, axis=1)
+            sums = np.zeros_like(C)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=n_lists) == 0
+            sums[empty] = C[empty]
+            C = l2_normalize(sums)
+        assign = np.concatenate([
+            np.argmax(self.matrix[s:s + self.chunk_size] @ C.T, axis=1)
+            for s in range(0, n, self.chunk_size)
+        ])
+        self.centroids = C
+        self._list_order = np.argsort(assign, kind="stable")
+        self._list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+        return self
+
+    def query_ivf(self, teams, k=10, nprobe=8):
+        """Approximate top-k: only scan the nprobe clusters closest to each query."""
+        if self.centroids is None:
+            raise RuntimeError("Call build_ivf() before query_ivf()")
+        Q = self._queries(teams)
+        probe, _ = topk_rows(Q @ self.centroids.T, nprobe)
+        out_i, out_s = [], []
+        for q, lists in zip(Q, probe):
+            rows = np.concatenate([
+                self._list_order[self._list_offsets[c]:self._list_offsets[c + 1]] for c in lists
+            ])
+            if rows.size == 0:
+                out_i.append(np.full(k, -1, dtype=np.int64))
+                out_s.append(np.full(k, -np.inf, dtype=np.float32))
+                continue
+            i, s = topk_rows((self.matrix[rows] @ q)[None, :], k)
+            pad = k - i.shape[1]
+            out_i.append(np.pad(rows[i[0]], (0, pad), constant_values=-1))
+            out_s.append(np.pad(s[0], (0, pad), constant_values=-np.inf))
+        return self._format(np.array(out_i), np.array(out_s))
+
+    def _format(self, idx, scores):
+        out = []
+        for row_i, row_s in zip(idx, scores):
+            hits = []
+            for i, s in zip(row_i, row_s):
+                if i < 0 or not np.isfinite(s):
+                    continue
+                champs = [IDX_TO_CHAMP[int(c)] for c in self.team_idx[i] if c >= 0]
+                hits.append((self.labels[i], champs, float(s)))
+            out.append(hits)
+        return out
+
+    def save(self, path):
+        np.savez(path, team_idx=self.team_idx, labels=self.labels,
+                 centroids=self.centroids if self.centroids is not None else np.zeros((0, 0), np.float32),
+                 list_order=self._list_order if self._list_order is not None else np.zeros(0, np.int64),
+                 list_offsets=self._list_offsets if self._list_offsets is not None else np.zeros(0, np.int64))
+
+    @classmethod
+    def load(cls, path, champ_index):
+        data = np.load(path, allow_pickle=True)
+        idx = cls(champ_index, data["team_idx"], data["labels"])
+        if data["centroids"].size:
+            idx.centroids = data["centroids"]
+            idx._list_order = data["list_order"]
+            idx._list_offsets = data["list_offsets"]
+        return idx
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Champion / composition similarity queries over the embed model.")
+    ap.add_argument("--champ", nargs="*", default=[], help="Champions to find substitutes for")
+    ap.add_argument("--team", nargs="*", default=[], help="A team (up to 5 champions) to find similar stored comps for")
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--ivf", action="store_true", help="Use the approximate IVF index for composition search")
+    args = ap.parse_args()
+
+    champ_index = ChampionSimilarityIndex.from_model()
+    if args.champ:
+        for c, hits in zip(args.champ, champ_index.similar_champions(args.champ, k=args.k)):
+            print(c, "->", ", ".join(f"{n} ({s:.3f})" for n, s in hits))
+    if args.team:
+        comps = CompositionIndex.from_store(champ_index)
+        if args.ivf:
+            comps.build_ivf()
+            hits = comps.query_ivf([args.team], k=args.k)[0]
+        else:
+            hits = comps.query([args.team], k=args.k)[0]
+        for label, champs, s in hits:
+            print(f"{s:.3f}  {label}  {champs}")
@@ -0,0 +1,113 @@
+# src/suggest.py
+import os, threading
+from concurrent.futures import ThreadPoolExecutor
+from src.draft_cache import canonical_key
+from src.ensemble import single_threaded
+
+
+def suggest_next(side, blue_list, red_list, candidates, score_many, topk=10):
+    """
+    Rank candidate picks for the side to move by how much they raise its win chance.
+    score_many(list of (blue, red)) -> list of P(Blue); the current draft and every
+    candidate draft are scored in one call.
+    """
+    states = [(blue_list, red_list)]
+    valid = []
+    for c in candidates:
+        if side == "blue":
+            nb, nr = blue_list + [c], red_list
+        else:
+            nb, nr = blue_list, red_list + [c]
+        if len(nb) > 5 or len(nr) > 5:
+            continue
+        valid.append(c)
+        states.append((nb, nr))
+    probs = score_many(states)
+    base = probs[0]
+    out = []
+    for c, p in zip(valid, probs[1:]):
+        # delta for the *side to move*
+        delta = (p - base) if side == "blue" else ((1 - p) - (1 - base))
+        out.append((c, p, delta))
+    # sort by delta, tie-break by probability for the relevant side
+    out.sort(key=lambda x: (x[2], x[1] if side == "blue" else (1 - x[1])), reverse=True)
+    return base, out[:topk]
+
+
+class SpeculativePrecomputer:
+    """
+    Background thread pool that precomputes suggestions for the draft states a user is
+    most likely to reach next (the top suggested picks), so the next rerun is a cache hit.
+    Results land in the shared DraftStateCache through score_many. Each session has at most
+    one live batch of speculative work; scheduling for a new draft cancels the old batch.
+    Every task predicts single-threaded, so the pool size is the whole CPU budget.
+    score_many(states, record=False) must skip the cache's hit/miss counters, so the hit rate
+    only reflects lookups for drafts the user actually showed.
+    """
+
+    def __init__(self, score_many, version, cpu_fraction=0.5, max_workers=None):
+        self.score_many = score_many
+        self.version = version
+        workers = max_workers or max(1, int((os.cpu_count() or 1) * cpu_fraction))
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculate")
+        self._sessions = {}  # session id -> (draft key, cancel event, futures)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.cancelled = 0
+
+    def _work(self, cancel, side, blue_list, red_list, candidates):
+        if cancel.is_set():
+            return
+        # models saved with n_jobs=-1 would otherwise use every core per task
+        with single_threaded():
+            suggest_next(side, blue_list, red_list, candidates,
+                         lambda states: self.score_many(states, record=False), topk=0)
+        with self._lock:
+            self.completed += 1
+
+    def schedule(self, session_id, side, blue_list, red_list, top_picks, candidates, breadth=5):
+        """Speculate on the states after each of the top `breadth` picks for `side`."""
+        key = canonical_key(blue_list, red_list, self.version) + (side,)
+        with self._lock:
+            self._prune(keep=session_id)
+            prev = self._sessions.get(session_id)
+            if prev and prev[0] == key:
+                return  # already speculating on this draft
+            if prev:
+                self._cancel(prev)
+            cancel = threading.Event()
+            futures = []
+            # the other side's options on the current draft (user flips the radio)
+            other = "red" if side == "blue" else "blue"
+            futures.append(self.pool.submit(self._work, cancel, other, blue_list, red_list, candidates))
+            for c, _, _ in top_picks[:breadth]:
+                nb, nr = (blue_list + [c], red_list) if side == "blue" else (blue_list, red_list + [c])
+                rest = [x for x in candidates if x != c]
+                # pick order can give either side the next pick
+                for nxt in (other, side):
+                    futures.append(self.pool.submit(self._work, cancel, nxt, nb, nr, rest))
+            self._sessions[session_id] = (key, cancel, futures)
+
+    def _prune(self, keep=None):
+        """Forget other sessions whose speculative work has all finished (callers hold the lock)."""
+        done = [sid for sid, (_, _, fs) in self._sessions.items() if sid != keep and all(f.done() for f in fs)]
+        for sid in done:
+            del self._sessions[sid]
+
+    def _cancel(self, entry):
+        _, cancel, futures = entry
+        cancel.set()
+        for f in futures:
+            if f.cancel():
+                self.cancelled += 1
+
+    def cancel(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry:
+                self._cancel(entry)
+
+    def stats(self):
+        with self._lock:
+            pending = sum(1 for _, _, fs in self._sessions.values() for f in fs if not f.done())
+        return {"pending": pending, "completed": self.completed, "cancelled": self.cancelled}
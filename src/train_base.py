@@ -3,7 +3,12 @@ import joblib, os
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from src.preprocess import load_base_data
-from config import MODEL_DIR
+from config import MODEL_DIR, RF_BASE_PARAMS
+
+def fit_rf(X_train, y_train, n_jobs=-1, params=None):
+    rf = RandomForestClassifier(**(params or RF_BASE_PARAMS), n_jobs=n_jobs, random_state=42)
+    rf.fit(X_train, y_train)
+    return rf
 
 def train_rf():
     X, y = load_base_data()
@@ -11,9 +16,8 @@ def train_rf():
     split = int(len(X) * 0.8)
     X_train, X_hold = X[:split], X[split:]
     y_train, y_hold = y[:split], y[split:]
-    rf = RandomForestClassifier(n_estimators=300, max_depth=12, n_jobs=-1, random_state=42)
     print("Training RF on", X_train.shape)
-    rf.fit(X_train, y_train)
+    rf = fit_rf(X_train, y_train)
     hold_acc = rf.score(X_hold, y_hold)
     cv = cross_val_score(rf, X_train, y_train, cv=5, n_jobs=-1)
     print("Holdout accuracy:", hold_acc)
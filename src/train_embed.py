@@ -3,8 +3,8 @@ import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
 import json
-from config import CHAMP_INDEX_PATH, MODEL_DIR
-from preprocess import load_base_data
+from config import CHAMP_INDEX_PATH, MODEL_DIR, EMBED_PARAMS
+from src.preprocess import load_base_data
 import numpy as np
 from src.utils import parse_champion_list
 import joblib
@@ -15,8 +15,9 @@ with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
 NUM_CHAMPS = len(CHAMP_TO_IDX)
 
 class CompDataset(Dataset):
-    def __init__(self, csv_path):
-        X, y = load_base_data()
+    def __init__(self, csv_path, X=None, y=None):
+        if X is None:
+            X, y = load_base_data()
         self.X = X
         self.y = y
 
@@ -59,11 +60,11 @@ class CompEmbedNet(nn.Module):
         x = torch.cat([be, re, side_flag.unsqueeze(1).float()], dim=1)
         return self.fc(x).squeeze(1)
 
-def train_embed(epochs=12, batch_size=256, lr=1e-3):
-    ds = CompDataset(None)
-    loader = DataLoader(ds, batch_size=batch_size, shuffle=True, num_workers=2)
+def fit_embed(X, y, epochs, batch_size, lr, emb_dim, num_workers=2, verbose=True):
+    ds = CompDataset(None, X, y)
+    loader = DataLoader(ds, batch_size=batch_size, shuffle=True, num_workers=num_workers)
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = CompEmbedNet(NUM_CHAMPS, emb_dim=64).to(device)
+    model = CompEmbedNet(NUM_CHAMPS, emb_dim=emb_dim).to(device)
     opt = torch.optim.Adam(model.parameters(), lr=lr)
     loss_fn = nn.BCELoss()
     for ep in range(epochs):
@@ -80,8 +81,31 @@ def train_embed(epochs=12, batch_size=256, lr=1e-3):
             loss.backward()
             opt.step()
             total_loss += loss.item() * label.size(0)
-        print(f"Epoch {ep} loss {total_loss/len(ds):.4f}")
-    torch.save(model.state_dict(), f"{MODEL_DIR}/embed_base.pt")
+        if verbose:
+            print(f"Epoch {ep} loss {total_loss/len(ds):.4f}")
+    return model
+
+def predict_embed_batch(model, X, y=None, batch_size=1024):
+    """P(Blue wins) for every row of a signed matrix X."""
+    ds = CompDataset(None, X, np.zeros(len(X)) if y is None else y)
+    loader = DataLoader(ds, batch_size=batch_size, shuffle=False)
+    device = next(model.parameters()).device
+    model.eval()
+    out = []
+    with torch.no_grad():
+        for blue_idx, red_idx, _ in loader:
+            side_flag = torch.ones(blue_idx.size(0), dtype=torch.float32).to(device)
+            out.append(model(blue_idx.to(device), red_idx.to(device), side_flag).cpu().numpy())
+    return np.concatenate(out) if out else np.zeros(0)
+
+def train_embed(epochs=None, batch_size=None, lr=None, X=None, y=None, out_path=None, num_workers=2):
+    epochs = epochs or EMBED_PARAMS["epochs"]
+    batch_size = batch_size or EMBED_PARAMS["batch_size"]
+    lr = lr or EMBED_PARAMS["lr"]
+    if X is None:
+        X, y = load_base_data()
+    model = fit_embed(X, y, epochs, batch_size, lr, EMBED_PARAMS["emb_dim"], num_workers=num_workers)
+    torch.save(model.state_dict(), out_path or f"{MODEL_DIR}/embed_base.pt")
     print("Saved embedding model")
     return model
 
@@ -0,0 +1,135 @@
+# src/train_ooc.py
+import argparse, os, time
+import numpy as np
+import pandas as pd
+import joblib
+from config import BASE_CSV, MODEL_DIR, MATCH_STORE_DIR, OOC_PARAMS
+from src.ooc_models import FactorizationMachine, PairLinearModel
+from src.utils import CHAMP_TO_IDX, champs_to_index_matrix, parse_champion_list
+
+# Out-of-core training: data is streamed in fixed-size chunks of (match_id, blue_idx, red_idx, y),
+# so memory depends on chunk_size and the model, never on the number of matches.
+
+
+# -------------------------
+# Chunk sources
+# -------------------------
+def iter_store_chunks(patches=None, regions=None, chunk_size=50000, root=MATCH_STORE_DIR, rng=None):
+    """Stream the match store part file by part file (file order shuffled when rng is given)."""
+    import pyarrow.parquet as pq
+    from src.match_store import _partition_files, BLUE_COLS, RED_COLS
+    files = [f for _, _, f in _partition_files(patches, regions, root)]
+    if rng is not None:
+        rng.shuffle(files)
+    for f in files:
+        for batch in pq.ParquetFile(f).iter_batches(batch_size=chunk_size,
+                                                    columns=["match_id", "winner"] + BLUE_COLS + RED_COLS):
+            df = batch.to_pandas()
+            yield (df["match_id"].to_numpy(), df[BLUE_COLS].to_numpy(dtype=np.int64),
+                   df[RED_COLS].to_numpy(dtype=np.int64), df["winner"].to_numpy(dtype=np.int64))
+
+
+def iter_csv_chunks(path=BASE_CSV, chunk_size=50000):
+    """Stream a base_matches.csv-style file (winner is "Blue"/"Red") in file order."""
+    for df in pd.read_csv(path, chunksize=chunk_size):
+        df = df.dropna(subset=["winner"])
+        blue = champs_to_index_matrix([parse_champion_list(s) for s in df["blue_champs"]])
+        red = champs_to_index_matrix([parse_champion_list(s) for s in df["red_champs"]])
+        ids = df["match_id"].to_numpy() if "match_id" in df else df.index.to_numpy()
+        yield ids, blue, red, (df["winner"] == "Blue").to_numpy(dtype=np.int64)
+
+
+def is_holdout(ids, every):
+    """Stable holdout assignment from the match id, so every epoch and run agrees."""
+    return pd.util.hash_array(np.asarray(ids).astype(str)) % every == 0
+
+
+# -------------------------
+# Models
+# -------------------------
+def make_model(kind, num_champs, params=None):
+    params = {**OOC_PARAMS, **(params or {})}
+    if kind == "sgd":
+        return PairLinearModel(num_champs, alpha=params["alpha"])
+    if kind == "fm":
+        return FactorizationMachine(num_champs, dim=params["fm_dim"], lr=params["fm_lr"], reg=params["fm_reg"])
+    raise ValueError(f"Unknown model kind {kind!r} (expected 'sgd' or 'fm')")
+
+
+# -------------------------
+# Training loop
+# -------------------------
+def fit_ooc(model, chunks_fn, epochs=3, holdout_every=10, seed=42, verbose=True):
+    """
+    chunks_fn(rng) -> iterator of (ids, blue_idx, red_idx, y). Each epoch streams all chunks
+    (shuffled file/chunk order, rows shuffled within a chunk) and partial_fits the training rows;
+    rows whose match id hashes into the holdout are skipped here and scored by evaluate_ooc.
+    """
+    rng = np.random.default_rng(seed)
+    for epoch in range(epochs):
+        t0, n = time.time(), 0
+        for ids, b, r, y in chunks_fn(rng):
+            train = ~is_holdout(ids, holdout_every) if holdout_every else np.ones(len(y), dtype=bool)
+            order = rng.permutation(np.flatnonzero(train))
+            if len(order):
+                model.partial_fit(b[order], r[order], y[order])
+                n += len(order)
+        if verbose:
+            print(f"epoch {epoch + 1}/{epochs}: {n} rows in {time.time() - t0:.1f}s")
+    return model
+
+
+def evaluate_ooc(model, chunks, holdout_every=10):
+    """Streaming accuracy / log loss over the holdout rows."""
+    n = correct = 0
+    loss = 0.0
+    for ids, b, r, y in chunks:
+        hold = is_holdout(ids, holdout_every) if holdout_every else np.ones(len(y), dtype=bool)
+        if not hold.any():
+            continue
+        p = np.clip(model.predict_proba_idx(b[hold], r[hold])[:, 1], 1e-7, 1 - 1e-7)
+        yh = y[hold]
+        n += len(yh)
+        correct += int(((p >= 0.5) == yh).sum())
+        loss -= float((yh * np.log(p) + (1 - yh) * np.log(1 - p)).sum())
+    return {"n": n, "accuracy": correct / n if n else float("nan"), "log_loss": loss / n if n else float("nan")}
+
+
+def train_ooc(kind="sgd", source="store", patches=None, regions=None, csv_path=BASE_CSV,
+              params=None, out_path=None):
+    params = {**OOC_PARAMS, **(params or {})}
+    num_champs = len(CHAMP_TO_IDX)
+    if source == "store":
+        chunks_fn = lambda rng=None: iter_store_chunks(patches, regions, params["chunk_size"], rng=rng)
+    else:
+        chunks_fn = lambda rng=None: iter_csv_chunks(csv_path, params["chunk_size"])
+    model = make_model(kind, num_champs, params)
+    print(f"Out-of-core {kind} over {num_champs} champions, chunks of {params['chunk_size']} rows")
+    fit_ooc(model, chunks_fn, params["epochs"], params["holdout_every"])
+    if params["holdout_every"]:
+        m = evaluate_ooc(model, chunks_fn(), params["holdout_every"])
+        print(f"Holdout ({m['n']} rows): accuracy {m['accuracy']:.4f}, log loss {m['log_loss']:.4f}")
+    path = out_path or os.path.join(MODEL_DIR, f"ooc_{kind}.joblib")
+    joblib.dump(model, path)
+    print("Saved out-of-core model to", path)
+    return model
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Train a draft model by streaming chunks from disk (constant memory).")
+    ap.add_argument("--model", choices=["sgd", "fm"], default="sgd",
+                    help="sgd: logistic regression over champion + pair features; fm: factorization machine")
+    ap.add_argument("--source", choices=["store", "csv"], default="store")
+    ap.add_argument("--csv", default=BASE_CSV, help="CSV to stream when --source csv")
+    ap.add_argument("--patches", nargs="*", default=None)
+    ap.add_argument("--regions", nargs="*", default=None)
+    ap.add_argument("--epochs", type=int, default=OOC_PARAMS["epochs"])
+    ap.add_argument("--chunk-size", type=int, default=OOC_PARAMS["chunk_size"])
+    ap.add_argument("--out", default=None, help="Output path (default models/ooc_<model>.joblib)")
+    args = ap.parse_args()
+    train_ooc(args.model, args.source, args.patches, args.regions, args.csv,
+              params={"epochs": args.epochs, "chunk_size": args.chunk_size}, out_path=args.out)
+
+
+if __name__ == "__main__":
+    main()
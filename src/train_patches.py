@@ -0,0 +1,89 @@
+# src/train_patches.py
+import argparse, json, os, time
+import joblib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import PATCH_MODEL_DIR
+from src.match_store import list_partitions
+from src.preprocess import load_store_data
+from src.train_base import fit_rf
+from src.utils import patch_key
+
+
+def patch_windows(patches, window=1):
+    """Map each patch to the `window` most recent patches up to and including it."""
+    ordered = sorted(set(patches), key=patch_key)
+    return {p: ordered[max(0, i - window + 1):i + 1] for i, p in enumerate(ordered)}
+
+
+def train_patch(patch, window_patches, regions=None, with_embed=False, min_matches=200):
+    """Train and save the models for one patch; runs inside a pool worker."""
+    t0 = time.time()
+    X, y = load_store_data(patches=window_patches, regions=regions)
+    if len(y) < min_matches:
+        return {"patch": patch, "skipped": f"only {len(y)} matches"}
+    out_dir = os.path.join(PATCH_MODEL_DIR, patch)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # seeded random 20% holdout (part files carry no ingestion order, so there is no "last 20%")
+    order = np.random.default_rng(42).permutation(len(y))
+    split = int(len(X) * 0.8)
+    train, hold = order[:split], order[split:]
+    # one core per patch: the parallelism is across patches
+    rf = fit_rf(X[train], y[train], n_jobs=1)
+    hold_acc = float(rf.score(X[hold], y[hold])) if len(hold) else None
+    joblib.dump(rf, os.path.join(out_dir, "rf_base.joblib"))
+
+    if with_embed:
+        from src.train_embed import train_embed
+        train_embed(X=X, y=y, out_path=os.path.join(out_dir, "embed_base.pt"), num_workers=0)
+
+    meta = {
+        "patch": patch,
+        "window": window_patches,
+        "regions": regions,
+        "n_matches": int(len(y)),
+        # champion index size at training time; inference vectorizes to this width
+        "num_champs": int(X.shape[1]),
+        "holdout_acc": hold_acc,
+        "embed": with_embed,
+        "train_seconds": round(time.time() - t0, 1),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Train one model per patch (or rolling patch window) in parallel.")
+    ap.add_argument("--patches", nargs="*", default=None, help="Patches to train (default: every patch in the match store)")
+    ap.add_argument("--regions", nargs="*", default=None, help="Restrict training data to these regions")
+    ap.add_argument("--window", type=int, default=1, help="Train each patch on itself plus the previous window-1 patches")
+    ap.add_argument("--embed", action="store_true", help="Also train an embedding model per patch")
+    ap.add_argument("--min-matches", type=int, default=200, help="Skip patches with fewer matches")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    available = sorted({p for p, _ in list_partitions()}, key=patch_key)
+    windows = patch_windows(available, args.window)
+    targets = args.patches or available
+    missing = [p for p in targets if p not in windows]
+    if missing:
+        print("No data in the match store for patches:", missing)
+    targets = [p for p in targets if p in windows]
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(train_patch, p, windows[p], args.regions, args.embed, args.min_matches): p
+            for p in targets
+        }
+        for fut in as_completed(futures):
+            p = futures[fut]
+            try:
+                print(p, fut.result())
+            except Exception as e:
+                print("Training failed for patch", p, e)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# src/tune.py
+import argparse, json, math, os, random, shutil, tempfile, time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from config import BASE_CSV, WORLDS_CSV, MODEL_DIR, TUNED_PARAMS_PATH
+from src.utils import patch_key, index_matrix_to_signed
+
+# Search spaces; every key maps to the kwarg of the model it tunes
+SPACES = {
+    "rf_base": {
+        "n_estimators": [100, 200, 300, 500, 800],
+        "max_depth": [6, 8, 10, 12, 16, 20, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", "log2", 0.2],
+    },
+    "embed": {
+        "emb_dim": [16, 32, 64, 128],
+        "lr": [3e-4, 1e-3, 3e-3],
+        "batch_size": [128, 256, 512],
+        "epochs": [8, 12, 20],
+    },
+}
+SPACES["rf_world"] = SPACES["rf_base"]
+
+
+# -------------------------
+# Data: featurize once, share read-only
+# -------------------------
+def load_featurized(target, source="csv", patches=None):
+    """Return X, y, patch labels for the target's training data."""
+    if target == "rf_world":
+        from src.preprocess import load_worlds_data
+        X, y = load_worlds_data()
+        # dtype=str: "15.20" read as a float would become "15.2" and sort before "15.19"
+        return X, y, pd.read_csv(WORLDS_CSV, usecols=["patch"], dtype={"patch": str})["patch"].values
+    if source == "store":
+        from src.match_store import load_matches, BLUE_COLS, RED_COLS, SLOT_COLS
+        df = load_matches(patches, columns=["patch", "winner"] + SLOT_COLS)
+        X = index_matrix_to_signed(df[BLUE_COLS].to_numpy(np.int64), df[RED_COLS].to_numpy(np.int64))
+        return X, df["winner"].to_numpy(np.int64), df["patch"].astype(str).values
+    from src.preprocess import load_base_data
+    X, y = load_base_data()
+    return X, y, pd.read_csv(BASE_CSV, usecols=["patch"], dtype={"patch": str})["patch"].values
+
+
+def patch_ordered_split(X, y, patches, holdout_frac=0.2):
+    """Stable-sort rows by patch and hold out the most recent fraction."""
+    order = sorted(range(len(y)), key=lambda i: patch_key(patches[i]))
+    X, y = X[order], y[order]
+    split = int(len(y) * (1 - holdout_frac))
+    return X[:split], y[:split], X[split:], y[split:]
+
+
+def share_arrays(arrays):
+    """Dump arrays to .npy files so workers can memory-map them instead of pickling copies."""
+    tmp = tempfile.mkdtemp(prefix="lol_tune_")
+    paths = {}
+    for name, arr in arrays.items():
+        paths[name] = os.path.join(tmp, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(arr))
+    return tmp, paths
+
+
+_DATA = None
+
+
+def _init_worker(paths):
+    global _DATA
+    _DATA = {k: np.load(p, mmap_mode="r") for k, p in paths.items()}
+
+
+# -------------------------
+# One trial
+# -------------------------
+def run_trial(target, params, budget, seed=42):
+    """Fit params on the most recent `budget` fraction of train rows (and scaled trees/epochs); score on holdout."""
+    t0 = time.time()
+    X_tr, y_tr = _DATA["X_train"], _DATA["y_train"]
+    X_ho, y_ho = _DATA["X_hold"], _DATA["y_hold"]
+    k = max(1, int(len(y_tr) * budget))
+    X_tr, y_tr = X_tr[-k:], y_tr[-k:]
+    if target in ("rf_base", "rf_world"):
+        p = dict(params, n_estimators=max(10, int(round(params["n_estimators"] * budget))))
+        model = RandomForestClassifier(**p, n_jobs=1, random_state=seed)
+        model.fit(X_tr, y_tr)
+        prob = model.predict_proba(X_ho)[:, 1]
+    else:
+        from src.train_embed import fit_embed, predict_embed_batch
+        epochs = max(1, int(round(params["epochs"] * budget)))
+        model = fit_embed(np.asarray(X_tr), np.asarray(y_tr), epochs, params["batch_size"], params["lr"],
+                          params["emb_dim"], num_workers=0, verbose=False)
+        prob = predict_embed_batch(model, np.asarray(X_ho))
+    prob = np.clip(prob, 1e-6, 1 - 1e-6)
+    return {
+        "params": params,
+        "budget": budget,
+        "logloss": float(log_loss(y_ho, prob, labels=[0, 1])),
+        "accuracy": float(accuracy_score(y_ho, prob >= 0.5)),
+        "seconds": round(time.time() - t0, 2),
+    }
+
+
+# -------------------------
+# Successive halving / Hyperband
+# -------------------------
+def sample_configs(space, n, rng):
+    return [{k: rng.choice(v) for k, v in space.items()} for _ in range(n)]
+
+
+def successive_halving(pool, target, configs, min_budget, eta, bracket=0):
+    """Evaluate configs at increasing budgets, keeping the best 1/eta each rung, until budget 1.0."""
+    results = []
+    budget = min_budget
+    rung = 0
+    while configs:
+        futures = [pool.submit(run_trial, target, c, budget) for c in configs]
+        rung_res = [f.result() for f in futures]
+        for r in rung_res:
+            r.update({"bracket": bracket, "rung": rung})
+        results.extend(rung_res)
+        print(f"bracket {bracket} rung {rung}: {len(configs)} configs at budget {budget:.3f}, "
+              f"best logloss {min(r['logloss'] for r in rung_res):.4f}")
+        if budget >= 1.0:
+            break
+        keep = max(1, len(configs) // eta)
+        rung_res.sort(key=lambda r: r["logloss"])
+        configs = [r["params"] for r in rung_res[:keep]]
+        budget = min(1.0, budget * eta)
+        rung += 1
+    return results
+
+
+def hyperband(pool, target, space, min_budget, eta, rng):
+    s_max = int(math.floor(math.log(1 / min_budget, eta) + 1e-9))
+    results = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        configs = sample_configs(space, n, rng)
+        results.extend(successive_halving(pool, target, configs, eta ** -s, eta, bracket=s))
+    return results
+
+
+def write_results(target, results):
+    rows = [dict(r, params=json.dumps(r["params"])) for r in results]
+    board = pd.DataFrame(rows).sort_values(["budget", "logloss"], ascending=[False, True])
+    board_path = os.path.join(MODEL_DIR, f"tuning_{target}_leaderboard.csv")
+    board.to_csv(board_path, index=False)
+    print("Saved leaderboard to", board_path)
+
+    full = [r for r in results if r["budget"] >= 1.0] or results
+    best = min(full, key=lambda r: r["logloss"])
+    tuned = {}
+    if os.path.exists(TUNED_PARAMS_PATH):
+        with open(TUNED_PARAMS_PATH, "r", encoding="utf8") as f:
+            tuned = json.load(f)
+    tuned[target] = best["params"]
+    with open(TUNED_PARAMS_PATH, "w", encoding="utf8") as f:
+        json.dump(tuned, f, indent=2)
+    print(f"Best {target}: {best['params']} logloss={best['logloss']:.4f} acc={best['accuracy']:.4f}")
+    print("Wrote best config to", TUNED_PARAMS_PATH)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Successive-halving / Hyperband hyperparameter search.")
+    ap.add_argument("--target", choices=sorted(SPACES), default="rf_base")
+    ap.add_argument("--source", choices=["csv", "store"], default="csv", help="Training data for rf_base / embed")
+    ap.add_argument("--patches", nargs="*", default=None, help="Store patches to use (with --source store)")
+    ap.add_argument("--mode", choices=["sh", "hyperband"], default="sh")
+    ap.add_argument("--n-configs", type=int, default=27, help="Initial configs for successive halving")
+    ap.add_argument("--min-budget", type=float, default=1 / 9, help="Smallest budget (fraction of data/trees/epochs)")
+    ap.add_argument("--eta", type=int, default=3)
+    ap.add_argument("--holdout", type=float, default=0.2, help="Most recent fraction (by patch) held out")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    X, y, patches = load_featurized(args.target, args.source, args.patches)
+    X_train, y_train, X_hold, y_hold = patch_ordered_split(X, y, patches, args.holdout)
+    print("Train", X_train.shape, "holdout", X_hold.shape)
+    tmp, paths = share_arrays({"X_train": X_train, "y_train": y_train, "X_hold": X_hold, "y_hold": y_hold})
+    del X, X_train, X_hold
+
+    rng = random.Random(args.seed)
+    space = SPACES[args.target]
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(paths,)) as pool:
+            if args.mode == "hyperband":
+                results = hyperband(pool, args.target, space, args.min_budget, args.eta, rng)
+            else:
+                configs = sample_configs(space, args.n_configs, rng)
+                results = successive_halving(pool, args.target, configs, args.min_budget, args.eta)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    write_results(args.target, results)
+
+
+if __name__ == "__main__":
+    main()
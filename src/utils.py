@@ -1,22 +1,97 @@
 # src/utils.py
-import json, numpy as np
+import json, os, numpy as np
 from ast import literal_eval
 from config import CHAMP_INDEX_PATH
-with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
-    CHAMP_TO_IDX = json.load(f)
+# empty until scripts/build_champion_index.py (or the match store) has written the index
+CHAMP_TO_IDX = {}
+if os.path.exists(CHAMP_INDEX_PATH):
+    with open(CHAMP_INDEX_PATH, "r", encoding="utf8") as f:
+        CHAMP_TO_IDX = json.load(f)
 IDX_TO_CHAMP = {int(v):k for k,v in CHAMP_TO_IDX.items()}
 
-def champs_to_signed_vector(blue, red):
-    C = len(CHAMP_TO_IDX)
+def champs_to_signed_vector(blue, red, num_champs=None):
+    # num_champs: width the model was trained with; ids are append-only, so champions
+    # added to the index later (id >= num_champs) are unknown to it and skipped
+    C = num_champs or len(CHAMP_TO_IDX)
     v = np.zeros(C, dtype=np.float32)
     for c in blue:
-        if c in CHAMP_TO_IDX:
+        if CHAMP_TO_IDX.get(c, C) < C:
             v[CHAMP_TO_IDX[c]] += 1.0
     for c in red:
-        if c in CHAMP_TO_IDX:
+        if CHAMP_TO_IDX.get(c, C) < C:
             v[CHAMP_TO_IDX[c]] -= 1.0
     return v
 
+def extend_champ_index(champs):
+    """Append unseen champions to the index (existing ids never move) and save it; returns #added."""
+    new = sorted({c for c in champs if c and c not in CHAMP_TO_IDX})
+    for c in new:
+        CHAMP_TO_IDX[c] = len(CHAMP_TO_IDX)
+        IDX_TO_CHAMP[CHAMP_TO_IDX[c]] = c
+    if new:
+        with open(CHAMP_INDEX_PATH, "w", encoding="utf8") as f:
+            json.dump(CHAMP_TO_IDX, f, ensure_ascii=False, indent=2)
+    return len(new)
+
+def champs_to_index_matrix(champ_lists, size=5, keep_slots=False):
+    """
+    Map a list of champion-name lists to an (n, size) int array of indices, -1 = empty/unknown slot.
+    Unknown champions are dropped and the rest packed left, unless keep_slots=True, which leaves
+    -1 in their slot so column j is always the j-th listed champion.
+    """
+    out = np.full((len(champ_lists), size), -1, dtype=np.int64)
+    for i, champs in enumerate(champ_lists):
+        if keep_slots:
+            idx = [CHAMP_TO_IDX.get(c, -1) for c in champs][:size]
+        else:
+            idx = [CHAMP_TO_IDX[c] for c in champs if c in CHAMP_TO_IDX][:size]
+        out[i, :len(idx)] = idx
+    return out
+
+def index_matrix_to_signed(blue_idx, red_idx, num_champs=None):
+    """Vectorized champs_to_signed_vector for (n, k) index arrays (-1 slots and ids >= num_champs are skipped)."""
+    C = num_champs or len(CHAMP_TO_IDX)
+    n = blue_idx.shape[0]
+    X = np.zeros((n, C), dtype=np.float32)
+    rows = np.arange(n)
+    for idx, sign in ((blue_idx, 1.0), (red_idx, -1.0)):
+        for j in range(idx.shape[1]):
+            col = idx[:, j]
+            mask = (col >= 0) & (col < C)
+            np.add.at(X, (rows[mask], col[mask]), sign)
+    return X
+
+def fit_width(X, num_champs):
+    """Trim / zero-pad signed vectors to a model's champion count (columns past it are newer champions)."""
+    if X.shape[1] > num_champs:
+        return X[:, :num_champs]
+    if X.shape[1] < num_champs:
+        return np.hstack([X, np.zeros((X.shape[0], num_champs - X.shape[1]), dtype=X.dtype)])
+    return X
+
+def signed_to_index_matrix(X, size=5):
+    """Inverse of index_matrix_to_signed: signed vectors -> (blue_idx, red_idx), -1 padded."""
+    out = []
+    for mask in (X > 0, X < 0):
+        idx = np.full((X.shape[0], size), -1, dtype=np.int64)
+        rows, cols = np.nonzero(mask)
+        # rank of each hit within its row (np.nonzero returns row-major order)
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        keep = rank < size
+        idx[rows[keep], rank[keep]] = cols[keep]
+        out.append(idx)
+    return out[0], out[1]
+
+def patch_key(patch):
+    """Sortable key for a patch string: "15.9" < "15.20" < "16.1"."""
+    out = []
+    for part in str(patch).split("."):
+        try:
+            out.append(int(part))
+        except ValueError:
+            out.append(0)
+    return tuple(out)
+
 def parse_champion_list(s):
     if isinstance(s, list):
         return s